@@ -0,0 +1,8 @@
+"""Throughput benchmarks for the simulation and training loop.
+
+Run with ``python main.py --bench`` or ``python -m benchmarks``.
+"""
+
+from .harness import SCENARIOS, run_benchmarks
+
+__all__ = ["SCENARIOS", "run_benchmarks"]
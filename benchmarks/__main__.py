@@ -0,0 +1,40 @@
+import argparse
+import json
+import os
+import sys
+
+if __name__ == "__main__":
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Clean JSON
+    from . import SCENARIOS, run_benchmarks
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        choices=list(SCENARIOS),
+        help="Scenarios to run (default: all).",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiplier on the amount of work per scenario (default: 1.0).",
+    )
+    parser.add_argument("--output", help="Also write the JSON report here.")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.scenarios or None, args.seed, args.scale)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    over = [
+        name
+        for name, result in report["scenarios"].items()
+        if result.get("within_budget") is False
+    ]
+    if over:
+        sys.exit(f"Over budget: {', '.join(over)}")
@@ -0,0 +1,377 @@
+"""Fixed-seed headless benchmark scenarios.
+
+Every scenario builds fresh, untrained teams, seeds ``random``, NumPy and
+torch, times a fixed amount of work and returns a dictionary of results.
+Scenarios never load or save models, and pass logging goes to a temporary
+database, so running the suite leaves the working tree untouched.
+"""
+
+import contextlib
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from src import constants, database
+from src.distributed import learn_from_workers
+from src.engine import MatchEngine
+from src.inference import BatchedInference
+from src.metrics import EpisodeLog
+from src.models.match import MatchState
+from src.observation import ObservationBuilder
+from src.replay import use_prioritized_replay
+from src.seeding import seed_everything
+from src.statistics import compile_pass_table, get_pass_network
+from src.train import create_teams, play_episode
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # Bytes on macOS, KiB elsewhere
+        return peak / 2**20
+    return peak / 2**10
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the per-pass prints while timing."""
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):
+            yield
+
+
+def summarize(latencies, unit="ticks"):
+    """Throughput and latency percentiles of a list of durations."""
+    latencies = np.asarray(latencies)
+    total = float(latencies.sum())
+    return {
+        "iterations": len(latencies),
+        "total_s": round(total, 4),
+        f"{unit}_per_s": round(len(latencies) / total, 2) if total else None,
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1e3, 4),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1e3, 4),
+    }
+
+
+def new_match():
+    real_madrid, kairat, ball = create_teams()
+    match = MatchState((real_madrid, kairat), ball)
+    return match, MatchEngine(match.teams, ball)
+
+
+def random_actions(engine, ticks, kicks=True):
+    """Uniform random actions for every player, optionally without kicks."""
+    sizes = np.array([p.action_size for p in engine.players])
+    actions = (np.random.rand(ticks, 1, len(sizes)) * sizes).astype(np.int64)
+    if not kicks:
+        keeper = engine.is_goalkeeper & (actions == 2)
+        defender = engine.is_defender & (actions == 0)
+        outfield = engine.is_outfield & (actions == 8)
+        actions[keeper] = 0  # Intercept instead
+        actions[defender] = 1  # Intercept instead
+        actions[outfield] = 9  # Stay instead
+    return actions
+
+
+def bench_physics(ticks):
+    """``MatchEngine.step`` with random moves and no kicks."""
+    _, engine = new_match()
+    actions = random_actions(engine, ticks, kicks=False)
+    latencies = []
+    for tick_actions in actions:
+        start = time.perf_counter()
+        if engine.step(tick_actions)[0] >= 0:
+            engine.reset()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def bench_observations(ticks):
+    """``ObservationBuilder.build`` and the per-player state views."""
+    _, engine = new_match()
+    observations = ObservationBuilder(engine)
+    actions = random_actions(engine, ticks, kicks=False)
+    latencies = []
+    for tick_actions in actions:
+        engine.step(tick_actions)
+        start = time.perf_counter()
+        observations.build()
+        observations.player_states()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def bench_actions(ticks):
+    """``choose_action`` of all 22 players, with inference epsilon."""
+    match, engine = new_match()
+    observations = ObservationBuilder(engine)
+    for player in match.players:
+        player.epsilon = 0.05
+    actions = random_actions(engine, ticks, kicks=False)
+    latencies = []
+    for tick_actions in actions:
+        engine.step(tick_actions)
+        observations.build()
+        states = observations.player_states()
+        start = time.perf_counter()
+        for player, state in zip(match.players, states):
+            player.choose_action(state)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def bench_inference(ticks):
+    """``BatchedInference.act`` for all 22 players, with inference epsilon."""
+    match, engine = new_match()
+    observations = ObservationBuilder(engine)
+    for player in match.players:
+        player.epsilon = 0.05
+    policy = BatchedInference(match.players)
+    actions = random_actions(engine, ticks, kicks=False)
+    latencies = []
+    for tick_actions in actions:
+        engine.step(tick_actions)
+        states = observations.build()
+        start = time.perf_counter()
+        policy.refresh()
+        policy.act(states)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def bench_replay(calls, prioritized=False):
+    """``replay`` on full replay memories, cycling through the players."""
+    match, _ = new_match()
+    if prioritized:
+        use_prioritized_replay(match.players)
+    for player in match.players:
+        size = player.state_size
+        capacity = player.memory.capacity
+        player.memory.extend(
+            np.random.rand(capacity, size).astype(np.float32),
+            np.random.randint(0, player.action_size, capacity),
+            np.random.randn(capacity).astype(np.float32),
+            np.random.rand(capacity, size).astype(np.float32),
+            np.zeros(capacity, dtype=np.float32),
+        )
+    latencies = []
+    for call in range(calls):
+        player = match.players[call % len(match.players)]
+        start = time.perf_counter()
+        player.replay()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, unit="calls")
+
+
+def bench_prioritized_replay(calls):
+    """``replay`` as above, from ``PrioritizedReplayBuffer`` memories."""
+    return bench_replay(calls, prioritized=True)
+
+
+def bench_kicks(kicks):
+    """``MatchEngine.kick`` with pass prediction and database logging.
+
+    The final flush of the pass writer is included in ``total_s``.
+    """
+    match, engine = new_match()
+    compile_pass_table(get_pass_network())
+    positions = np.random.rand(kicks, 2) * (
+        engine.field_width,
+        engine.field_height,
+    )
+    kickers = np.random.randint(0, len(match.players), kicks)
+    targets = np.random.rand(kicks, 2) * (
+        engine.field_width,
+        engine.field_height,
+    )
+    latencies = []
+    with quiet():
+        for position, kicker, target in zip(positions, kickers, targets):
+            engine.ball_position[0] = position
+            start = time.perf_counter()
+            engine.kick(0, kicker, target, 20)
+            latencies.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        database.get_writer().flush()
+        flush = time.perf_counter() - start
+    result = summarize(latencies, unit="kicks")
+    result["total_s"] = round(result["total_s"] + flush, 4)
+    result["flush_s"] = round(flush, 4)
+    result["kicks_per_s"] = round(kicks / result["total_s"], 2)
+    return result
+
+
+def bench_episode(ticks):
+    """One headless training episode through ``play_episode``."""
+    match, engine = new_match()
+    observations = ObservationBuilder(engine)
+    latencies = []
+    start = time.perf_counter()
+    with quiet():
+        play_episode(
+            match, engine, observations, max_ticks=ticks, tick_times=latencies
+        )
+        database.get_writer().flush()
+    elapsed = time.perf_counter() - start
+    result = summarize(latencies)
+    result["episode_s"] = round(elapsed, 4)
+    result["episodes_per_min"] = round(60 / elapsed, 4)
+    return result
+
+
+def bench_distributed(chunks, worker_counts=(1, 2, 4)):
+    """``learn_from_workers`` with 1, 2 and 4 rollout workers.
+
+    Reports, per worker count, the match ticks received per second and
+    the share of the learner's time spent replaying; a share near 1 means
+    the learner, not the workers, limits throughput. Worker start-up is
+    not timed. ``cpus`` is the number of CPUs the workers shared.
+    """
+    result = {"cpus": os.cpu_count(), "workers": {}}
+    with tempfile.TemporaryDirectory() as tmp, quiet():
+        for count in worker_counts:
+            real_madrid, kairat, _ = create_teams()
+            log = EpisodeLog(
+                os.path.join(tmp, f"scores_{count}.csv"),
+                os.path.join(tmp, f"metrics_{count}.csv"),
+            )
+            stats = learn_from_workers(
+                real_madrid.team_members + kairat.team_members,
+                (real_madrid, kairat),
+                count,
+                max_chunks=chunks,
+                seed=0,
+                log=log,
+            )
+            log.close()
+            seconds = stats["seconds"]
+            result["workers"][str(count)] = {
+                "chunks": stats["chunks"],
+                "total_s": round(seconds, 4),
+                "ticks_per_s": round(stats["ticks"] / seconds, 2),
+                "learner_busy": round(stats["learn_seconds"] / seconds, 3),
+            }
+        database.get_writer().flush()
+    return result
+
+
+# statement -> (import time budget in ms, modules it must not load)
+IMPORT_BUDGETS = {
+    "import src.constants": (50, ("numpy", "pygame", "torch", "pgmpy")),
+    "import main": (100, ("numpy", "pygame", "torch", "pgmpy")),
+    "import src.playback": (500, ("torch", "pgmpy")),
+    "import src.train": (5000, ("pgmpy",)),
+}
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+print(*[name for name in {forbidden!r} if name in sys.modules])
+"""
+
+
+def bench_imports(runs):
+    """Cold import time of the CLI and light modules, in fresh processes.
+
+    Each statement is timed ``runs`` times; it is within budget if its
+    median stays under the budget and it loads none of its forbidden
+    modules.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    latencies = []
+    result = {}
+    for statement, (budget_ms, forbidden) in IMPORT_BUDGETS.items():
+        times = []
+        for _ in range(runs):
+            probe = IMPORT_PROBE.format(
+                statement=statement, forbidden=forbidden
+            )
+            output = subprocess.run(
+                [sys.executable, "-c", probe],
+                cwd=root,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.splitlines()
+            times.append(float(output[-2]))
+            loaded = output[-1].split()
+        median_ms = float(np.median(times)) * 1e3
+        result[statement] = {
+            "p50_ms": round(median_ms, 2),
+            "budget_ms": budget_ms,
+            "loaded": loaded,
+            "within_budget": median_ms <= budget_ms and not loaded,
+        }
+        latencies.extend(times)
+    summary = summarize(latencies, unit="imports")
+    summary["within_budget"] = all(r["within_budget"] for r in result.values())
+    summary["modules"] = result
+    return summary
+
+
+def full_episode_ticks():
+    return int(constants.ROUND_DURATION * constants.MAX_ROUNDS * constants.FPS)
+
+
+# name -> (function, work size at scale 1.0)
+SCENARIOS = {
+    "physics": (bench_physics, 5000),
+    "observations": (bench_observations, 5000),
+    "actions": (bench_actions, 2000),
+    "inference": (bench_inference, 2000),
+    "replay": (bench_replay, 2000),
+    "prioritized_replay": (bench_prioritized_replay, 2000),
+    "kicks": (bench_kicks, 2000),
+    "episode": (bench_episode, full_episode_ticks()),
+    "distributed": (bench_distributed, 30),
+    "imports": (bench_imports, 5),
+}
+
+
+def run_benchmarks(names=None, seed=0, scale=1.0):
+    """Run the selected scenarios (all by default) and return the report.
+
+    Args:
+        names: Scenario names from ``SCENARIOS``.
+        seed: Seed applied before every scenario.
+        scale: Multiplier on the amount of work of every scenario.
+    """
+    names = list(SCENARIOS) if names is None else names
+    report = {
+        "seed": seed,
+        "scale": scale,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "torch": torch.__version__,
+        "machine": platform.machine(),
+        "scenarios": {},
+    }
+    db_file = database.DB_FILE
+    with tempfile.TemporaryDirectory() as tmp:
+        database.close_writer()
+        database.DB_FILE = os.path.join(tmp, "bench_stats.db")
+        try:
+            for name in names:
+                function, size = SCENARIOS[name]
+                seed_everything(seed)
+                result = function(max(1, int(size * scale)))
+                result["peak_rss_mb"] = peak_rss_mb()
+                report["scenarios"][name] = result
+        finally:
+            database.close_writer()
+            database.DB_FILE = db_file
+    return report
@@ -1,8 +1,9 @@
 import argparse
+import atexit
+import json
 import os
 
-from src.load import run_simulation
-from src.train import run_training
+from src.instrument import instrumentation
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -24,20 +25,230 @@ if __name__ == "__main__":
         default=10,
         help="The interval at which to call the replay method (default: 10).",
     )
+    parser.add_argument(
+        "--envs",
+        type=int,
+        default=1,
+        help="Number of matches to step together while training (default: 1).",
+    )
+    parser.add_argument(
+        "--share-roles",
+        action="store_true",
+        help="Train one network per team and role instead of per player.",
+    )
+    parser.add_argument(
+        "--prioritized-replay",
+        action="store_true",
+        help="Replay transitions with large TD errors more often.",
+    )
+    parser.add_argument(
+        "--async-learner",
+        action="store_true",
+        help="Train on a background thread instead of inside the tick loop.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Train with K rollout worker processes and a central learner.",
+    )
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Run the headless benchmark suite and print a JSON report.",
+    )
+    parser.add_argument(
+        "--bench-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier on the amount of work per benchmark (default: 1.0).",
+    )
+    parser.add_argument(
+        "--bench-output",
+        metavar="PATH",
+        help="Also write the benchmark report to PATH.",
+    )
+    parser.add_argument(
+        "--profile",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Time the hot-path phases and print a summary every N episodes.",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Time the hot-path phases and write a Chrome trace to PATH.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Seed every random number generator for a reproducible run.",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Save a training checkpoint every N episodes.",
+    )
+    parser.add_argument(
+        "--checkpoint-minutes",
+        type=float,
+        default=0,
+        metavar="M",
+        help="Save a training checkpoint at least every M minutes.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help="Training checkpoint file (default: models/checkpoint.pt).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue training from the checkpoint.",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        metavar="DIR",
+        help="Also write per-episode metrics as chunked NumPy files to DIR.",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Record every tick of the match to a replay file at PATH.",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="Play back a recorded match without running the players.",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="Playback speed multiplier for --replay (default: 1.0).",
+    )
+    parser.add_argument(
+        "--evaluate",
+        type=int,
+        metavar="N",
+        help="Play N headless matches of the saved models and report results.",
+    )
+    parser.add_argument(
+        "--eval-output",
+        metavar="PATH",
+        help="Also write the evaluation results to PATH as JSON.",
+    )
+    parser.add_argument(
+        "--sim-speed",
+        type=float,
+        default=1.0,
+        help="Simulated seconds per real second in the viewer (default: 1.0).",
+    )
     parser.add_argument(
         "--load",
         action="store_true",
         help="Load pre-trained models for simulation.",
     )
     args = parser.parse_args()
+    if args.workers:
+        ignored = {
+            "--share-roles": args.share_roles,
+            "--async-learner": args.async_learner,
+            "--record": args.record,
+            "--speed": args.speed != parser.get_default("speed"),
+        }
+        unsupported = [flag for flag, used in ignored.items() if used]
+        if unsupported:
+            parser.error(
+                f"{', '.join(unsupported)} cannot be combined with --workers"
+            )
+
+    if args.profile or args.trace:
+        instrumentation.enable(args.profile, trace=bool(args.trace))
+        # The simulation leaves through sys.exit, so report at exit
+        atexit.register(instrumentation.print_summary)
+        if args.trace:
+            atexit.register(instrumentation.write_trace, args.trace)
+
+    # torch, pygame and pgmpy take seconds to import, so every mode imports
+    # only the modules it runs
+    if args.replay:
+        from src.playback import play_recording
+
+        play_recording(args.replay, speed=args.replay_speed)
+    elif args.bench:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        from benchmarks import run_benchmarks
+
+        report = run_benchmarks(
+            seed=0 if args.seed is None else args.seed, scale=args.bench_scale
+        )
+        report = json.dumps(report, indent=2)
+        print(report)
+        if args.bench_output:
+            with open(args.bench_output, "w") as f:
+                f.write(report + "\n")
+    elif args.evaluate:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        from src.evaluate import run_evaluation
 
-    if args.train:
+        run_evaluation(
+            args.evaluate,
+            num_envs=args.envs,
+            seed=args.seed,
+            output=args.eval_output,
+        )
+    elif args.train and args.workers:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        from src.checkpoint import CHECKPOINT_FILE
+        from src.distributed import run_distributed_training
+
+        run_distributed_training(
+            args.train,
+            args.workers,
+            replay_interval=args.replay_interval,
+            num_envs=args.envs,
+            seed=args.seed,
+            prioritized_replay=args.prioritized_replay,
+            metrics_dir=args.metrics_dir,
+            checkpoint=args.checkpoint or CHECKPOINT_FILE,
+            checkpoint_every=args.checkpoint_every,
+            checkpoint_minutes=args.checkpoint_minutes,
+            resume=args.resume,
+        )
+    elif args.train:
         # In training mode, we don't need the full pygame video setup
         os.environ["SDL_VIDEODRIVER"] = "dummy"
+        from src.checkpoint import CHECKPOINT_FILE
+        from src.train import run_training
+
         run_training(
             args.train,
             speed_multiplier=args.speed,
             replay_interval=args.replay_interval,
+            num_envs=args.envs,
+            share_roles=args.share_roles,
+            async_learner=args.async_learner,
+            seed=args.seed,
+            record=args.record,
+            checkpoint=args.checkpoint or CHECKPOINT_FILE,
+            checkpoint_every=args.checkpoint_every,
+            checkpoint_minutes=args.checkpoint_minutes,
+            resume=args.resume,
+            metrics_dir=args.metrics_dir,
+            prioritized_replay=args.prioritized_replay,
         )
     else:
-        run_simulation(load_models=args.load)
+        from src.load import run_simulation
+
+        run_simulation(
+            load_models=args.load,
+            async_learner=args.async_learner,
+            seed=args.seed,
+            record=args.record,
+            sim_speed=args.sim_speed,
+        )
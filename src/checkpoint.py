@@ -0,0 +1,202 @@
+"""Consolidated training checkpoints written in the background.
+
+A checkpoint is one ``torch.save`` file holding, for every agent, its
+weights, optimizer state, epsilon and replay memory, plus the number of
+finished episodes, the number of episodes in the ``EpisodeLog`` and the
+state of every random number generator. It is
+written to a temporary file next to the target, flushed to disk and moved
+over the previous checkpoint, so a crash never leaves a partial file.
+"""
+
+import contextlib
+import copy
+import os
+import random
+import threading
+import time
+
+import numpy as np
+import torch
+
+from .replay import PrioritizedReplayBuffer
+
+CHECKPOINT_FILE = "models/checkpoint.pt"
+REPLAY_FIELDS = ("states", "next_states", "actions", "rewards", "dones")
+
+
+def agent_state(agent):
+    """A copy of everything ``agent`` needs to continue training."""
+    memory = agent.memory
+    with memory.lock:
+        replay = {name: getattr(memory, name).copy() for name in REPLAY_FIELDS}
+        replay["position"] = memory.position
+        replay["size"] = memory.size
+        if isinstance(memory, PrioritizedReplayBuffer):
+            replay["tree"] = memory.tree.copy()
+            replay["max_priority"] = memory.max_priority
+            replay["steps"] = memory.steps
+    return {
+        "name": agent.name,
+        "dqn": {
+            k: v.detach().clone() for k, v in agent.dqn.state_dict().items()
+        },
+        "optimizer": copy.deepcopy(agent.optimizer.state_dict()),
+        "epsilon": agent.epsilon,
+        "replay": replay,
+    }
+
+
+def restore_agent(agent, state):
+    agent.dqn.load_state_dict(state["dqn"])
+    if agent.actor_dqn is not agent.dqn:
+        agent.actor_dqn.load_state_dict(state["dqn"])
+    agent.optimizer.load_state_dict(state["optimizer"])
+    agent.epsilon = state["epsilon"]
+    agent.weights_version += 1
+    memory = agent.memory
+    replay = state["replay"]
+    with memory.lock:
+        for name in REPLAY_FIELDS:
+            getattr(memory, name)[:] = replay[name]
+        memory.position = replay["position"]
+        memory.size = replay["size"]
+    if isinstance(memory, PrioritizedReplayBuffer):
+        if "tree" not in replay:  # Saved without prioritized replay
+            memory.reset_priorities()
+            return
+        with memory.lock:
+            memory.tree[:] = replay["tree"]
+            memory.max_priority = replay["max_priority"]
+            memory.steps = replay["steps"]
+
+
+def rng_state(engine=None):
+    state = {
+        "random": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+    if engine is not None:
+        state["matches"] = [rng.bit_generator.state for rng in engine.rngs]
+    return state
+
+
+def restore_rng_state(state, engine=None):
+    random.setstate(state["random"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if engine is not None and len(state.get("matches", ())) == len(engine.rngs):
+        for rng, match_state in zip(engine.rngs, state["matches"]):
+            rng.bit_generator.state = match_state
+
+
+def write_checkpoint(path, checkpoint):
+    """Atomically replace ``path`` with ``checkpoint``."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        torch.save(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path, agents):
+    """Restore ``agents`` from the checkpoint at ``path``.
+
+    Returns:
+        The number of episodes finished when the checkpoint was taken, the
+        random generator state to pass to ``restore_rng_state`` once the
+        engine exists, and the number of episodes the ``EpisodeLog`` held
+        then (None if it was not recorded), to pass as its
+        ``start_episode``.
+    """
+    checkpoint = torch.load(path, weights_only=False)
+    states = checkpoint["agents"]
+    names = [agent.name for agent in agents]
+    if [state["name"] for state in states] != names:
+        raise ValueError(
+            f"Checkpoint {path} was written for different agents; "
+            "resume with the same --share-roles setting"
+        )
+    for agent, state in zip(agents, states):
+        restore_agent(agent, state)
+    print(f"Resumed from {path} after episode {checkpoint['episode']}")
+    return checkpoint["episode"], checkpoint["rng"], checkpoint.get("logged")
+
+
+class Checkpointer:
+    """Saves checkpoints every ``every_episodes`` episodes and/or every
+    ``every_minutes`` minutes.
+
+    ``maybe_save`` takes a snapshot on the training thread, which only
+    copies tensors and arrays, and leaves serialization and the disk write
+    to a background thread. At most one write is in flight. With an
+    ``AsyncLearner``, the snapshot is taken under its ``step_lock`` so it
+    never catches an agent halfway through an update. With an
+    ``EpisodeLog``, the checkpoint also records how many episodes it held.
+    """
+
+    def __init__(
+        self,
+        path,
+        agents,
+        engine=None,
+        learner=None,
+        log=None,
+        every_episodes=0,
+        every_minutes=0,
+    ):
+        self.path = path
+        self.agents = list(agents)
+        self.engine = engine
+        self.learner = learner
+        self.log = log
+        self.every_episodes = every_episodes
+        self.every_seconds = every_minutes * 60
+        self.last_save = time.monotonic()
+        self._thread = None
+
+    def due(self, episode):
+        if self.every_episodes and episode % self.every_episodes == 0:
+            return True
+        return bool(
+            self.every_seconds
+            and time.monotonic() - self.last_save >= self.every_seconds
+        )
+
+    def maybe_save(self, episode):
+        if self.due(episode):
+            self.save(episode)
+
+    def save(self, episode):
+        lock = contextlib.nullcontext()
+        if self.learner is not None:
+            lock = self.learner.step_lock
+        with lock:
+            agents = [agent_state(agent) for agent in self.agents]
+        checkpoint = {
+            "episode": episode,
+            "agents": agents,
+            "rng": rng_state(self.engine),
+            "logged": None if self.log is None else self.log.episode,
+        }
+        self.wait()
+        self.last_save = time.monotonic()
+        self._thread = threading.Thread(
+            target=write_checkpoint,
+            args=(self.path, checkpoint),
+            name="checkpoint-writer",
+        )
+        self._thread.start()
+
+    def wait(self):
+        """Block until the checkpoint being written is on disk."""
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.wait()
@@ -1,5 +1,3 @@
-import pygame
-
 # Screen dimensions
 FIELD_WIDTH = 1050
 FIELD_HEIGHT = 680
@@ -29,6 +27,5 @@ ROUND_DURATION = 45  # seconds
 MAX_ROUNDS = 2
 COUNTDOWN_TIME = 3
 
-pygame.font.init()
-FONT = pygame.font.Font(None, 36)
+FONT_SIZE = 36  # Scores and timer
 SPEED = 3
@@ -1,12 +1,44 @@
+import atexit
+import queue
 import sqlite3
+import threading
+import time
 from datetime import datetime
 
+from .instrument import timed
+
 DB_FILE = "soccer_stats.db"
 
+INSERT_PASS = """
+    INSERT INTO passes (
+        passer_name, passer_role, target_name, target_role, distance, angle,
+        defender_proximity, passer_speed, target_speed, pass_type, pressure,
+        player_skill, prediction, confidence, probability, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Markers understood by the PassWriter thread
+_FLUSH = object()
+_STOP = object()
+
 
 def init_db():
     """Initializes the database and creates tables if they don't exist."""
     conn = sqlite3.connect(DB_FILE)
+    configure(conn)
+    create_tables(conn)
+    conn.close()
+
+
+def configure(conn):
+    """Switches a connection to WAL mode with write-friendly pragmas."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-8000")
+
+
+def create_tables(conn):
     cursor = conn.cursor()
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS passes (
@@ -30,9 +62,128 @@ def init_db():
         )
     """)
     conn.commit()
-    conn.close()
 
 
+class PassWriter:
+    """Writes pass rows to SQLite from a background thread.
+
+    ``write`` only enqueues a row, so the simulation never waits on disk.
+    The thread keeps one connection open and inserts rows with
+    ``executemany`` in a single transaction once ``batch_size`` rows are
+    buffered or ``flush_interval`` seconds after the first buffered row.
+    At most ``max_queued`` rows wait in the queue; past that ``write``
+    blocks until the thread catches up. A batch that fails to insert is
+    reported and dropped, so the thread keeps running and ``flush`` and
+    ``close`` still return.
+    """
+
+    def __init__(
+        self,
+        db_file=DB_FILE,
+        batch_size=256,
+        flush_interval=1.0,
+        max_queued=65536,
+    ):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._thread = threading.Thread(
+            target=self._run, name="pass-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, row):
+        self._queue.put(row)
+
+    def flush(self):
+        """Blocks until every row written so far is committed."""
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """Commits the remaining rows and stops the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self):
+        try:
+            conn = sqlite3.connect(self.db_file)
+            configure(conn)
+            create_tables(conn)
+        except sqlite3.Error as e:
+            print(f"Could not open {self.db_file}; passes are not saved: {e}")
+            conn = None
+        batch = []
+        deadline = None
+        while True:
+            timeout = None
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # Time threshold reached
+
+            if item is None or item is _FLUSH or item is _STOP:
+                self._commit(conn, batch)
+                batch = []
+                deadline = None
+                if item is not None:
+                    self._queue.task_done()
+                if item is _STOP:
+                    break
+                continue
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(batch) >= self.batch_size:
+                self._commit(conn, batch)
+                batch = []
+                deadline = None
+        if conn is not None:
+            conn.close()
+
+    def _commit(self, conn, batch):
+        if not batch:
+            return
+        try:
+            if conn is not None:
+                with conn:
+                    conn.executemany(INSERT_PASS, batch)
+        except Exception as e:
+            print(f"Could not save {len(batch)} passes: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Returns the process-wide ``PassWriter``, starting it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = PassWriter(DB_FILE)
+            atexit.register(close_writer)
+        return _writer
+
+
+def close_writer():
+    """Flushes and stops the process-wide ``PassWriter``, if any."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+@timed("logging")
 def save_pass(
     passer_name,
     passer_role,
@@ -50,17 +201,8 @@ def save_pass(
     confidence,
     probability,
 ):
-    """Saves a pass prediction to the database."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute(
-        """
-        INSERT INTO passes (
-            passer_name, passer_role, target_name, target_role, distance, angle,
-            defender_proximity, passer_speed, target_speed, pass_type, pressure,
-            player_skill, prediction, confidence, probability, timestamp
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """,
+    """Queues a pass prediction to be saved to the database."""
+    get_writer().write(
         (
             passer_name,
             passer_role,
@@ -78,7 +220,5 @@ def save_pass(
             confidence,
             probability,
             datetime.now(),
-        ),
+        )
     )
-    conn.commit()
-    conn.close()
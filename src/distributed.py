@@ -0,0 +1,356 @@
+"""Distributed training: rollout worker processes feeding a central learner.
+
+Each worker owns a full copy of the 22 policies and plays headless matches on
+a ``VecEnv``. Transitions are streamed back to the learner in chunks of
+ticks; the learner trains the ``DQN`` of every player and periodically
+broadcasts the updated weights and epsilons back to the workers. Workers
+send the passes they kicked along with their transitions, so every pass is
+predicted with the learner's one pass network and logged by its one
+database writer.
+
+The learner replays once per player for every ``replay_interval`` ticks a
+worker plays, on its own, so its replay work grows with the number of
+workers and caps the throughput; ``python -m benchmarks distributed``
+measures where.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+import torch
+
+from . import constants
+from .checkpoint import (
+    CHECKPOINT_FILE,
+    Checkpointer,
+    load_checkpoint,
+    restore_rng_state,
+)
+from .environment import VecEnv
+from .metrics import EpisodeLog
+from .replay import use_prioritized_replay
+from .seeding import seed_everything, spawn_seeds
+from .train import create_teams, load_models, log_episode, save_models
+
+
+def export_weights(players):
+    """Snapshot the weights and epsilon of every player as NumPy arrays."""
+    return {
+        player.name: (
+            {k: v.numpy().copy() for k, v in player.dqn.state_dict().items()},
+            player.epsilon,
+        )
+        for player in players
+    }
+
+
+def apply_weights(players, weights):
+    """Load a snapshot made by ``export_weights`` into ``players``."""
+    for player in players:
+        state_dict, epsilon = weights[player.name]
+        player.dqn.load_state_dict(
+            {k: torch.from_numpy(v) for k, v in state_dict.items()}
+        )
+        player.epsilon = epsilon
+
+
+def rollout_worker(
+    worker_id,
+    weights,
+    num_envs,
+    chunk_ticks,
+    transitions,
+    updates,
+    stop,
+    seed=None,
+):
+    """Play matches with local policies and stream transitions back."""
+    torch.set_num_threads(1)
+    if seed is not None:
+        seed_everything(seed)
+    real_madrid, kairat, ball = create_teams()
+    players = real_madrid.team_members + kairat.team_members
+    apply_weights(players, weights)
+
+    max_ticks = int(
+        constants.ROUND_DURATION * constants.MAX_ROUNDS * constants.FPS
+    )
+    env = VecEnv((real_madrid, kairat), ball, num_envs, max_ticks, seed=seed)
+    env.engine.deferred_passes = passes = []
+    actions = np.zeros((num_envs, len(players)), dtype=np.int64)
+    observations = env.reset()
+
+    while not stop.is_set():
+        chunk = {key: [] for key in ("states", "actions", "rewards", "dones")}
+        scores = []
+        for _ in range(chunk_ticks):
+            states = torch.from_numpy(observations)
+            for i, player in enumerate(players):
+                actions[:, i] = player.choose_actions(
+                    states[:, i, : player.state_size]
+                )
+            next_observations, rewards, dones, info = env.step(actions)
+            chunk["states"].append(observations.copy())
+            chunk["actions"].append(actions.copy())
+            chunk["rewards"].append(rewards)
+            chunk["dones"].append(dones)
+            scores.extend(info["scores"].tolist())
+            observations = next_observations
+        chunk["states"].append(observations)
+        chunk = {key: np.stack(value) for key, value in chunk.items()}
+        chunk["passes"] = passes[:]
+        passes.clear()
+
+        while not stop.is_set():
+            try:
+                transitions.put((worker_id, chunk, scores), timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+        # Pick up the most recent weights, if the learner sent any
+        latest = None
+        while True:
+            try:
+                latest = updates.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None:
+            apply_weights(players, latest)
+
+
+def remember_chunk(players, chunk):
+    """Store every transition of a worker chunk in the players' memories."""
+    states = chunk["states"]
+    dones = np.broadcast_to(chunk["dones"][..., None], chunk["actions"].shape)
+    for i, player in enumerate(players):
+        player_states = states[..., i, : player.state_size]
+        player.remember_batch(
+            player_states[:-1].reshape(-1, player.state_size),
+            chunk["actions"][..., i].reshape(-1),
+            chunk["rewards"][..., i].reshape(-1),
+            player_states[1:].reshape(-1, player.state_size),
+            dones[..., i].reshape(-1),
+        )
+
+
+def record_passes(players, passes):
+    """Predict and log passes deferred by a worker's ``MatchEngine``."""
+    for passer, target, *inputs in passes:
+        players[passer].record_pass(players[target], *inputs)
+
+
+def run_distributed_training(
+    num_episodes,
+    num_workers,
+    replay_interval=10,
+    num_envs=1,
+    chunk_ticks=100,
+    sync_interval=4,
+    seed=None,
+    prioritized_replay=False,
+    metrics_dir=None,
+    checkpoint=CHECKPOINT_FILE,
+    checkpoint_every=0,
+    checkpoint_minutes=0,
+    resume=False,
+):
+    """
+    Trains with ``num_workers`` rollout processes and one learner.
+
+    Args:
+        num_episodes: Number of training episodes, summed over all workers
+        num_workers: Number of rollout worker processes
+        replay_interval: Replay once per player for every N collected ticks.
+        num_envs: Number of matches each worker steps together.
+        chunk_ticks: Ticks a worker plays before sending its transitions.
+        sync_interval: Broadcast weights after every N received chunks.
+        seed: Seeds the learner and, through independent derived seeds,
+            every worker. Chunks still reach the learner in arrival order.
+        prioritized_replay: Sample replay batches by TD error, see
+            ``replay.PrioritizedReplayBuffer``.
+        metrics_dir: Also write the episode metrics as chunked NumPy files
+            to this directory, see ``metrics.EpisodeLog``.
+        checkpoint: Path of the consolidated training checkpoint.
+        checkpoint_every: Checkpoint every this many episodes (0: never).
+        checkpoint_minutes: Also checkpoint when this many minutes have
+            passed since the last checkpoint (0: never).
+        resume: Restore the checkpoint and continue until ``num_episodes``
+            episodes have been played in total. Matches in progress on the
+            workers are not saved; workers start new ones with seeds drawn
+            from the restored generators.
+    """
+    print(
+        f"Starting distributed training for {num_episodes} episodes "
+        f"({num_workers} workers x {num_envs} matches)..."
+    )
+    if seed is not None:
+        seed_everything(seed)
+    real_madrid, kairat, _ = create_teams()
+    players = real_madrid.team_members + kairat.team_members
+    if prioritized_replay:
+        use_prioritized_replay(players)
+    load_models(players)
+    start_episode, logged = 0, None
+    if resume:
+        start_episode, rng, logged = load_checkpoint(checkpoint, players)
+        restore_rng_state(rng)
+        seed = None  # Derive fresh worker seeds from the restored generators
+    log = EpisodeLog(chunk_dir=metrics_dir, start_episode=logged)
+    checkpointer = None
+    if checkpoint_every or checkpoint_minutes:
+        checkpointer = Checkpointer(
+            checkpoint,
+            players,
+            log=log,
+            every_episodes=checkpoint_every,
+            every_minutes=checkpoint_minutes,
+        )
+    try:
+        learn_from_workers(
+            players,
+            (real_madrid, kairat),
+            num_workers,
+            num_episodes=num_episodes,
+            replay_interval=replay_interval,
+            num_envs=num_envs,
+            chunk_ticks=chunk_ticks,
+            sync_interval=sync_interval,
+            seed=seed,
+            start_episode=start_episode,
+            checkpointer=checkpointer,
+            log=log,
+        )
+    finally:
+        log.close()
+        if checkpointer is not None:
+            checkpointer.close()
+
+    print("Training complete. Saving models...")
+    save_models(players)
+
+
+def learn_from_workers(
+    players,
+    teams,
+    num_workers,
+    num_episodes=None,
+    max_chunks=None,
+    replay_interval=10,
+    num_envs=1,
+    chunk_ticks=100,
+    sync_interval=4,
+    seed=None,
+    start_episode=0,
+    checkpointer=None,
+    log=None,
+):
+    """Train ``players`` on the transitions of ``num_workers`` rollout
+    processes until ``num_episodes`` episodes have finished, counting
+    ``start_episode`` episodes played before, or ``max_chunks`` chunks have
+    been received. Finished episodes go to ``log``, a new ``EpisodeLog`` by
+    default, and to ``checkpointer``, if any.
+
+    Returns:
+        A dictionary with the number of chunks received and, counted from
+        the arrival of the first one so worker start-up is left out, the
+        match ticks received, the wall time and the time spent replaying.
+    """
+    if log is None:
+        log = EpisodeLog()
+    real_madrid, kairat = teams
+    worker_seeds = spawn_seeds(seed, num_workers)
+
+    ctx = mp.get_context("spawn")
+    transitions = ctx.Queue(maxsize=2 * num_workers)
+    updates = [ctx.Queue(maxsize=1) for _ in range(num_workers)]
+    stop = ctx.Event()
+    weights = export_weights(players)
+    workers = [
+        ctx.Process(
+            target=rollout_worker,
+            args=(
+                worker_id,
+                weights,
+                num_envs,
+                chunk_ticks,
+                transitions,
+                updates[worker_id],
+                stop,
+                worker_seeds[worker_id],
+            ),
+            daemon=True,
+        )
+        for worker_id in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    max_ticks = int(
+        constants.ROUND_DURATION * constants.MAX_ROUNDS * constants.FPS
+    )
+    finished_episodes = start_episode
+    chunks = 0
+    replays_per_chunk = max(1, chunk_ticks // replay_interval)
+    start = None
+    learn_time = 0.0
+    try:
+        while (num_episodes is None or finished_episodes < num_episodes) and (
+            max_chunks is None or chunks < max_chunks
+        ):
+            _, chunk, scores = transitions.get()
+            remember_chunk(players, chunk)
+            record_passes(players, chunk["passes"])
+            learn_start = time.perf_counter()
+            if start is None:
+                start = learn_start
+            for _ in range(replays_per_chunk):
+                for player in players:
+                    player.replay()
+                    player.decay_epsilon()
+            learn_time += time.perf_counter() - learn_start
+
+            for score in scores:
+                if finished_episodes == num_episodes:
+                    break
+                finished_episodes += 1
+                real_madrid.score, kairat.score = score
+                log_episode(
+                    log,
+                    finished_episodes,
+                    num_episodes,
+                    (real_madrid, kairat),
+                    players,
+                    max_ticks,
+                )
+                if checkpointer is not None:
+                    checkpointer.maybe_save(finished_episodes)
+
+            chunks += 1
+            if chunks % sync_interval == 0:
+                weights = export_weights(players)
+                for update in updates:
+                    try:
+                        update.put_nowait(weights)
+                    except queue.Full:
+                        pass  # The worker has not picked up the last one yet
+    finally:
+        stop.set()
+        for update in updates:
+            update.cancel_join_thread()
+        for worker in workers:
+            while worker.is_alive():
+                try:
+                    transitions.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+                worker.join(timeout=0.1)
+
+    return {
+        "chunks": chunks,
+        "ticks": max(0, chunks - 1) * chunk_ticks * num_envs,
+        "seconds": time.perf_counter() - start if chunks else 0.0,
+        "learn_seconds": learn_time,
+    }
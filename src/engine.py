@@ -0,0 +1,449 @@
+"""Structure-of-arrays match engine.
+
+Positions, velocities, roles, team ids and start positions of every player
+live in NumPy arrays with a leading match axis, so movement, ball physics
+and goal detection run as one batched operation per tick instead of a
+Python loop over ``Player`` objects. Separation and zone clamping depend on
+the order players take their turns in and run as a plain loop per match.
+The ``Player`` objects keep their policies and are only synced from the
+arrays when something (state building, drawing) still needs them.
+
+The nearest teammate and opponent distances of the observations, the
+crowded pairs of the rewards and the pass target and nearest defender of
+a logged pass come from a ``SpatialGrid`` that is rebuilt lazily, only
+after the positions have changed. Separation checks each player against
+its teammates directly and does not use the grid.
+"""
+
+import math
+
+import numpy as np
+
+from . import constants
+from .seeding import match_rngs
+from .spatial import SpatialGrid
+
+ROLES = ("Goalkeeper", "Defender", "Midfielder", "Forwards")
+GOALKEEPER, DEFENDER, MIDFIELDER, FORWARDS = range(len(ROLES))
+
+KICK_RANGE = 15
+MAX_BALL_SPEED = 25
+GRID_CELL_SIZE = 120  # Largest proximity query radius, so queries stay local
+
+# Unit steps for the midfielder/forward actions: 8 directions, kick, stay
+DIAGONAL = 1 / 1.414
+DIRECTIONS = np.array(
+    [
+        (0, -1),  # North
+        (DIAGONAL, -DIAGONAL),  # North-East
+        (1, 0),  # East
+        (DIAGONAL, DIAGONAL),  # South-East
+        (0, 1),  # South
+        (-DIAGONAL, DIAGONAL),  # South-West
+        (-1, 0),  # West
+        (-DIAGONAL, -DIAGONAL),  # North-West
+        (0, 0),  # Kick
+        (0, 0),  # Stay
+    ]
+)
+
+
+class MatchEngine:
+    """Batched physics for ``num_matches`` matches between the same teams.
+
+    ``teams[0]`` is the side defending the left goal, as set up by
+    ``Team.create_players`` for Real Madrid. ``seed`` seeds the per-match
+    random streams; by default they are derived from NumPy's global
+    generator. With ``log_passes`` off, kicks skip the pass prediction and
+    its printing and database logging; the ball moves the same either way.
+    Setting ``deferred_passes`` to a list makes kicks append the inputs of
+    ``Player.record_pass`` to it instead, as (passer index, target index,
+    distance, angle, defender proximity, passer speed, target speed).
+    """
+
+    def __init__(
+        self,
+        teams,
+        ball,
+        num_matches=1,
+        field_width=constants.FIELD_WIDTH,
+        field_height=constants.FIELD_HEIGHT,
+        seed=None,
+        log_passes=True,
+    ):
+        self.teams = teams
+        self.ball = ball
+        self.log_passes = log_passes
+        self.deferred_passes = None
+        self.players = [p for team in teams for p in team.team_members]
+        self.num_matches = num_matches
+        # Kick randomness of each match comes from its own stream
+        self.rngs = match_rngs(seed, num_matches)
+        self.field_width = field_width
+        self.field_height = field_height
+        self.goal_top = (field_height - constants.GOAL_HEIGHT) // 2
+        self.goal_bottom = (field_height + constants.GOAL_HEIGHT) // 2
+
+        players = self.players
+        self.roles = np.array([ROLES.index(p.role) for p in players])
+        self.team_ids = np.array(
+            [t for t, team in enumerate(teams) for _ in team.team_members]
+        )
+        self.left_side = self.team_ids == 0
+        self.radii = np.array([p.radius for p in players], dtype=np.float64)
+        self.accuracy = np.array([p.accuracy for p in players])
+        self.start_positions = np.array(
+            [tuple(p.start_position) for p in players], dtype=np.float64
+        )
+        self.ball_radius = ball.radius
+        self.ball_start = np.array([field_width // 2, field_height // 2])
+
+        self.is_goalkeeper = self.roles == GOALKEEPER
+        self.is_defender = self.roles == DEFENDER
+        self.is_outfield = (self.roles == MIDFIELDER) | (self.roles == FORWARDS)
+        self.teammates = self.team_ids[:, None] == self.team_ids[None, :]
+        np.fill_diagonal(self.teammates, False)
+        self.mates = [np.flatnonzero(row).tolist() for row in self.teammates]
+
+        # Separation parameters, as used by the per-object loops
+        midfielder = self.roles == MIDFIELDER
+        self.min_distance = np.where(midfielder, 120.0, 20.0)
+        self.push_strength = np.where(midfielder, 2.0, 0.5)
+
+        self._build_zones()
+        self._build_targets()
+
+        self.grid = SpatialGrid(field_width, field_height, GRID_CELL_SIZE)
+        self._grid_stale = True
+
+        shape = (num_matches, len(players), 2)
+        self.positions = np.empty(shape)
+        self.velocities = np.zeros(shape)
+        self.ball_position = np.empty((num_matches, 2))
+        self.ball_velocity = np.zeros((num_matches, 2))
+        self.reset()
+
+    def _build_zones(self):
+        """Precompute the ``stay_in_zone`` clamping box of every player."""
+        margin = self.radii
+        third = self.field_width / 3
+        self.zone_min = np.stack([margin, margin], axis=1)
+        self.zone_max = np.stack(
+            [self.field_width - margin, self.field_height - margin], axis=1
+        )
+        keeper_min = np.where(
+            self.left_side, margin, self.field_width - third * 0.5
+        )
+        keeper_max = np.where(
+            self.left_side, third * 0.5, self.field_width - margin
+        )
+        self.zone_min[:, 0] = np.where(
+            self.is_goalkeeper, keeper_min, self.zone_min[:, 0]
+        )
+        self.zone_max[:, 0] = np.where(
+            self.is_goalkeeper, keeper_max, self.zone_max[:, 0]
+        )
+
+    def _build_targets(self):
+        """Precompute the fixed x coordinates used by role actions."""
+        width = self.field_width
+        penalty_half = constants.PENALTY_AREA_WIDTH // 2
+        self.keeper_min_x = np.where(
+            self.left_side, self.radii, width - penalty_half
+        )
+        self.keeper_max_x = np.where(
+            self.left_side, penalty_half, width - self.radii
+        )
+        self.defence_x = np.where(
+            self.left_side, width // 4, width - width // 4
+        ).astype(np.float64)
+        self.tackle_x = np.where(self.left_side, width * 0.6, width * 0.4)
+        self.goal_x = np.where(self.left_side, width, 0).astype(np.float64)
+        # Goalkeepers pass to the first midfielder of their team
+        self.keeper_pass_target = np.array(
+            [
+                np.flatnonzero(
+                    (self.team_ids == team) & (self.roles == MIDFIELDER)
+                )[0]
+                for team in self.team_ids
+            ]
+        )
+
+    def reset(self, matches=None):
+        """Put players and ball back on their start spots.
+
+        ``matches`` selects which matches to reset (an index array or boolean
+        mask); all of them are reset by default.
+        """
+        if matches is None:
+            matches = slice(None)
+        self.positions[matches] = self.start_positions
+        self.velocities[matches] = 0
+        self.ball_position[matches] = self.ball_start
+        self.ball_velocity[matches] = 0
+        self._grid_stale = True
+
+    def spatial_index(self):
+        """The ``SpatialGrid`` of the current positions of every match."""
+        if self._grid_stale:
+            self.grid.rebuild(self.positions)
+            self._grid_stale = False
+        return self.grid
+
+    def step(self, actions):
+        """Advance every match by one tick.
+
+        Args:
+            actions: Integer array of shape (num_matches, num_players).
+
+        Returns:
+            An array with, for each match, the index of the team that scored
+            this tick or -1.
+        """
+        self.apply_actions(actions)
+        self.position_players()
+        self.move_ball()
+        self.check_bounds()
+        return self.detect_goals()
+
+    def distances_to_ball(self):
+        return np.linalg.norm(
+            self.positions - self.ball_position[:, None, :], axis=-1
+        )
+
+    def can_reach_ball(self):
+        return self.distances_to_ball() <= (
+            self.radii + self.ball_radius + KICK_RANGE
+        )
+
+    def apply_actions(self, actions):
+        """Resolve the role-specific actions of all players at once."""
+        actions = np.asarray(actions)
+        ball = self.ball_position[:, None, :]
+        ball_x = np.broadcast_to(ball[..., 0], actions.shape)
+        ball_y = np.broadcast_to(ball[..., 1], actions.shape)
+        ball_distance = self.distances_to_ball()
+        can_reach = ball_distance <= (
+            self.radii + self.ball_radius + KICK_RANGE
+        )
+
+        keeper = self.is_goalkeeper
+        defender = self.is_defender
+        outfield = self.is_outfield
+
+        # Kicks and dives change the ball, so they are resolved in player
+        # order before anyone moves, like the sequential update loop.
+        kicks = can_reach & (
+            (keeper & (actions == 2))
+            | (defender & (actions == 0))
+            | (outfield & (actions == 8))
+        )
+        dives = can_reach & keeper & (actions == 1)
+        for match, index in zip(*np.nonzero(kicks | dives)):
+            if dives[match, index]:
+                self.ball_velocity[match] *= 0.1
+            elif keeper[index]:
+                target = self.positions[
+                    match, self.keeper_pass_target[index]
+                ].copy()
+                self.kick(match, index, target, 20)
+            elif defender[index]:
+                target = np.array(
+                    [
+                        self.tackle_x[index],
+                        self.rngs[match].uniform(0, self.field_height),
+                    ]
+                )
+                self.kick(match, index, target, 10)
+            else:
+                target = np.array([self.goal_x[index], self.field_height / 2])
+                self.kick(match, index, target, 20)
+
+        # Everything else is a move towards a target at a fixed speed
+        targets = np.zeros(actions.shape + (2,))
+        speeds = np.zeros(actions.shape)
+
+        intercept = keeper & (actions == 0)
+        targets[..., 0] = np.where(
+            intercept,
+            np.clip(ball_x, self.keeper_min_x, self.keeper_max_x),
+            targets[..., 0],
+        )
+        targets[..., 1] = np.where(
+            intercept,
+            np.clip(ball_y, self.goal_top, self.goal_bottom),
+            targets[..., 1],
+        )
+        speeds[intercept] = 3
+
+        in_half = np.where(
+            self.left_side,
+            ball_x < self.field_width / 2,
+            ball_x > self.field_width / 2,
+        )
+        chase = defender & (
+            ((actions == 1) & in_half & (ball_distance < 200)) | (actions == 2)
+        )
+        back = defender & ~chase & ~kicks
+        targets[chase] = np.broadcast_to(ball, targets.shape)[chase]
+        speeds[chase] = 2.5
+        targets[..., 0] = np.where(back, self.defence_x, targets[..., 0])
+        targets[..., 1] = np.where(back, ball_y, targets[..., 1])
+        speeds[back] = 1.8
+
+        moving = speeds > 0
+        direction = targets - self.positions
+        length = np.linalg.norm(direction, axis=-1, keepdims=True)
+        np.divide(direction, length, out=direction, where=length > 0)
+        steps = np.where(moving[..., None], direction * speeds[..., None], 0)
+
+        # Midfielders and forwards step in one of eight directions
+        steps += np.where(
+            outfield[:, None],
+            DIRECTIONS[np.where(outfield, actions, 9)] * constants.SPEED,
+            0,
+        )
+        self.positions += steps
+        self._grid_stale = True
+
+    def kick(self, match, index, target, power):
+        """Kick the ball of ``match`` from player ``index`` towards ``target``.
+
+        Mirrors ``Player.kick_ball``: the pass is predicted and logged through
+        the kicking ``Player`` (if ``log_passes`` is on) and the shot
+        deviates with its accuracy.
+        """
+        direction = target - self.ball_position[match]
+        length = math.hypot(direction[0], direction[1])
+        if length == 0:
+            return  # Skip kick if ball is exactly under player
+        direction = direction / length
+
+        if self.log_passes:
+            self.log_pass(match, index, target, direction)
+
+        # The deviation ends up applied in radians, as in Player.kick_ball
+        angle_dev = (1 - self.accuracy[index]) * 90
+        deviation = self.rngs[match].uniform(-angle_dev, angle_dev)
+        cos, sin = math.cos(deviation), math.sin(deviation)
+        self.ball_velocity[match] = (
+            np.array(
+                [
+                    direction[0] * cos - direction[1] * sin,
+                    direction[0] * sin + direction[1] * cos,
+                ]
+            )
+            * power
+        )
+
+    def log_pass(self, match, index, target, direction):
+        """Predict and log the pass of player ``index`` towards ``target``
+        through ``Player.record_pass``."""
+        grid = self.spatial_index()
+        own_team = self.team_ids == self.team_ids[index]
+        target_index, _ = grid.nearest(match, target, own_team)
+        _, defender_proximity = grid.nearest(
+            match, self.positions[match, index], ~own_team
+        )
+        inputs = (
+            float(np.linalg.norm(self.positions[match, index] - target)),
+            abs(math.degrees(math.atan2(direction[1], direction[0]))),
+            defender_proximity,
+            float(np.linalg.norm(self.velocities[match, index])),
+            float(np.linalg.norm(self.velocities[match, target_index])),
+        )
+        if self.deferred_passes is not None:
+            self.deferred_passes.append((index, int(target_index)) + inputs)
+        else:
+            self.players[index].record_pass(self.players[target_index], *inputs)
+
+    def position_players(self):
+        """Push close teammates apart and clamp every player into its zone.
+
+        Players take turns in order, as with ``Player.separate_from_others``
+        followed by ``Player.stay_in_zone`` for each player: a player pushes
+        itself and each teammate closer than its ``min_distance`` apart, one
+        teammate at a time and with its own push strength, and is then
+        clamped into its zone. Every push changes the distances checked
+        after it, so the turns are resolved one after another, match by
+        match.
+        """
+        min_distance = self.min_distance.tolist()
+        push_strength = self.push_strength.tolist()
+        zone_min, zone_max = self.zone_min.tolist(), self.zone_max.tolist()
+        for positions in self.positions:
+            xs, ys = positions[:, 0].tolist(), positions[:, 1].tolist()
+            for i, mates in enumerate(self.mates):
+                limit, strength = min_distance[i], push_strength[i]
+                for j in mates:
+                    dx, dy = xs[i] - xs[j], ys[i] - ys[j]
+                    dist = math.sqrt(dx * dx + dy * dy)
+                    if dist < limit and dist > 0:
+                        overlap = (limit - dist) / 2
+                        push_x = dx / dist * overlap * strength
+                        push_y = dy / dist * overlap * strength
+                        xs[i] += push_x
+                        ys[i] += push_y
+                        xs[j] -= push_x
+                        ys[j] -= push_y
+                (min_x, min_y), (max_x, max_y) = zone_min[i], zone_max[i]
+                xs[i] = max(min_x, min(xs[i], max_x))
+                ys[i] = max(min_y, min(ys[i], max_y))
+            positions[:, 0] = xs
+            positions[:, 1] = ys
+        self._grid_stale = True
+
+    def move_ball(self):
+        self.ball_position += self.ball_velocity
+        # Apply simple friction
+        self.ball_velocity *= 0.98
+        # Limit speed
+        speed = np.linalg.norm(self.ball_velocity, axis=1)
+        too_fast = speed > MAX_BALL_SPEED
+        self.ball_velocity[too_fast] *= (MAX_BALL_SPEED / speed[too_fast])[
+            :, None
+        ]
+
+    def check_bounds(self):
+        """Bounce the balls off the walls, leaving the goal mouths open."""
+        x = self.ball_position[:, 0]
+        y = self.ball_position[:, 1]
+        r = self.ball_radius
+        in_mouth = (self.goal_top < y) & (y < self.goal_bottom)
+
+        past_left = x - r < 0
+        left = past_left & ~in_mouth
+        right = ~past_left & (x + r > self.field_width) & ~in_mouth
+        top = y - r < 0
+        bottom = ~top & (y + r > self.field_height)
+
+        x[left] = r
+        x[right] = self.field_width - r
+        y[top] = r
+        y[bottom] = self.field_height - r
+        self.ball_velocity[left | right, 0] *= -0.8
+        self.ball_velocity[top | bottom, 1] *= -0.8
+
+        bounced = left | right | top | bottom
+        slow = np.linalg.norm(self.ball_velocity, axis=1) < 0.5
+        self.ball_velocity[bounced & slow] = 0
+
+    def detect_goals(self):
+        """Return the scoring team index of every match, or -1."""
+        x = self.ball_position[:, 0]
+        y = self.ball_position[:, 1]
+        in_mouth = (self.goal_top <= y) & (y <= self.goal_bottom)
+        scorer = np.full(self.num_matches, -1)
+        scorer[in_mouth & (x + self.ball_radius >= self.field_width)] = 0
+        scorer[in_mouth & (x - self.ball_radius <= 0)] = 1
+        return scorer
+
+    def sync(self, match=0):
+        """Copy the array state of ``match`` onto the player and ball objects."""
+        for player, position, velocity in zip(
+            self.players, self.positions[match], self.velocities[match]
+        ):
+            player.position.update(position[0], position[1])
+            player.velocity.update(velocity[0], velocity[1])
+        self.ball.position.update(*self.ball_position[match])
+        self.ball.velocity.update(*self.ball_velocity[match])
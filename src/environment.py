@@ -0,0 +1,120 @@
+"""Vectorized environment stepping many independent matches together."""
+
+import numpy as np
+
+from . import instrument
+from .engine import MIDFIELDER, MatchEngine
+from .observation import NEAR_RADIUS, ObservationBuilder
+
+
+class VecEnv:
+    """Steps ``num_envs`` matches at once on a shared ``MatchEngine``.
+
+    Observations come from an ``ObservationBuilder`` as a (num_envs,
+    num_players, MAX_STATE_SIZE) float32 array; each player's features are
+    the first ``state_size`` entries of its row. The array is reused two
+    ``step`` calls later, so copy it to keep it longer. A match
+    restarts from kick-off after a goal and starts over with a clean score
+    once it reaches ``max_ticks``.
+    """
+
+    def __init__(self, teams, ball, num_envs, max_ticks, seed=None):
+        self.engine = MatchEngine(teams, ball, num_matches=num_envs, seed=seed)
+        self.num_envs = num_envs
+        self.max_ticks = max_ticks
+        self.ticks = np.zeros(num_envs, dtype=np.int64)
+        self.scores = np.zeros((num_envs, len(teams)), dtype=np.int64)
+        self.observations = ObservationBuilder(self.engine)
+
+    @property
+    def num_players(self):
+        return len(self.engine.players)
+
+    def reset(self):
+        """Reset every match and return the first observations."""
+        self.engine.reset()
+        self.ticks[:] = 0
+        self.scores[:] = 0
+        return self.observe()
+
+    def step(self, actions):
+        """Apply one action per player per match and advance one tick.
+
+        Returns:
+            A tuple of (observations, rewards, dones, info). ``dones`` marks
+            matches that scored a goal or ran out of time this tick; their
+            observations already come from the restarted match.
+            ``info["finished"]`` marks matches that reached ``max_ticks`` and
+            ``info["scores"]`` holds their final scores.
+        """
+        with instrument.phase("physics"):
+            scorer = self.engine.step(actions)
+        self.ticks += 1
+        with instrument.phase("observe"):
+            rewards = self.rewards(scorer)
+
+        goals = scorer >= 0
+        self.scores[np.flatnonzero(goals), scorer[goals]] += 1
+        finished = self.ticks >= self.max_ticks
+        dones = goals | finished
+        info = {"finished": finished, "scores": self.scores[finished].copy()}
+
+        if dones.any():
+            self.engine.reset(dones)
+        self.ticks[finished] = 0
+        self.scores[finished] = 0
+        with instrument.phase("observe"):
+            observations = self.observe()
+        return observations, rewards, dones, info
+
+    def observe(self):
+        """Build the state vector of every player in every match."""
+        return self.observations.build()
+
+    def rewards(self, scorer):
+        """The reward of every player in every match, see ``match_rewards``."""
+        return match_rewards(self.engine, scorer)
+
+
+def match_rewards(engine, scorer):
+    """``helping.calculate_reward`` for every player of every match.
+
+    Rewards are for the tick just stepped, from the positions after it and
+    before any reset, and ``scorer`` is what ``MatchEngine.step`` returned.
+    All training loops use this function, so they learn the same rewards.
+
+    Returns:
+        A float32 array of shape (num_matches, num_players).
+    """
+    x = engine.positions[..., 0]
+    y = engine.positions[..., 1]
+    rewards = np.zeros(engine.positions.shape[:2])
+
+    # Penalty for being out of bounds
+    inside = (
+        (5 < x)
+        & (x < engine.field_width - 5)
+        & (5 < y)
+        & (y < engine.field_height - 5)
+    )
+    rewards -= np.where(inside, 0, 0.09)
+
+    # Reward for distance from other midfielders
+    midfielder = engine.roles == MIDFIELDER
+    match, i, j, dist = engine.spatial_index().pairs_within(NEAR_RADIUS)
+    close = midfielder[i] & midfielder[j] & engine.teammates[i, j] & (dist < 75)
+    crowded = np.zeros(rewards.shape, dtype=bool)
+    crowded[match[close], i[close]] = True
+    crowded[match[close], j[close]] = True
+    rewards += np.where(midfielder, np.where(crowded, -0.2, 0.05), 0)
+
+    # Main game objective rewards
+    goal = (scorer >= 0)[:, None]
+    scored = scorer[:, None] == engine.team_ids[None, :]
+    ball_distance = engine.distances_to_ball()
+    rewards += np.select(
+        [goal, engine.can_reach_ball(), ball_distance < 150],
+        [np.where(scored, 5, -5), 0.3, 0.2],
+        -0.02,
+    )
+    return rewards.astype(np.float32)
@@ -0,0 +1,142 @@
+"""Headless evaluation of trained players.
+
+Matches are played like ``run_simulation`` but in simulated time: a round
+lasts ``ROUND_DURATION * FPS`` ticks, countdowns and the pause after a goal
+take no ticks, nothing is drawn and nothing waits on the clock. Players
+only act; they neither remember nor learn. ``num_envs`` matches are stepped
+together on one ``MatchEngine``, each player choosing its actions for all
+of them in one batched forward pass.
+"""
+
+import json
+import time
+
+import numpy as np
+
+from . import constants, instrument
+from .engine import MatchEngine
+from .inference import BatchedInference
+from .load import load_trained_models
+from .models.match import MatchState
+from .observation import ObservationBuilder
+from .seeding import seed_everything
+from .statistics import get_pass_network
+from .train import create_teams
+
+
+def play_matches(match, engine, observations):
+    """Play one full match on every match of ``engine``.
+
+    Returns:
+        A (num_matches, 2) array with the final scores.
+    """
+    players = match.players
+    round_ticks = int(constants.ROUND_DURATION * constants.FPS)
+    actions = np.zeros((engine.num_matches, len(players)), dtype=np.int64)
+    scores = np.zeros((engine.num_matches, len(match.teams)), dtype=np.int64)
+    policy = BatchedInference(players)
+
+    engine.reset()
+    for tick in range(round_ticks * constants.MAX_ROUNDS):
+        if tick and tick % round_ticks == 0:
+            engine.reset()  # Kick-off of the next round
+        with instrument.phase("observe"):
+            states = observations.build()
+        with instrument.phase("act"):
+            actions[:] = policy.act(states)
+        with instrument.phase("physics"):
+            scorer = engine.step(actions)
+        goals = scorer >= 0
+        if goals.any():
+            scores[np.flatnonzero(goals), scorer[goals]] += 1
+            engine.reset(goals)
+    return scores
+
+
+def run_evaluation(
+    num_matches,
+    num_envs=1,
+    load_models=True,
+    seed=None,
+    output=None,
+    log_passes=False,
+):
+    """Play ``num_matches`` headless matches and report the results.
+
+    Args:
+        num_matches: Number of full matches to play.
+        num_envs: Number of matches stepped together.
+        load_models: Load the saved player models; otherwise the players
+            are untrained.
+        seed: Seed for every random number generator.
+        output: Optional path of a JSON file receiving every score and the
+            summary.
+        log_passes: Predict, print and store every pass as a simulation
+            does. Off by default; it does not change the results.
+
+    Returns:
+        The summary dictionary, with the scores under ``"scores"``.
+    """
+    if seed is not None:
+        seed_everything(seed)
+    real_madrid, kairat, ball = create_teams()
+    match = MatchState((real_madrid, kairat), ball)
+    if load_models:
+        load_trained_models(match.players)
+    if log_passes:
+        get_pass_network()
+
+    num_envs = max(1, min(num_envs, num_matches))
+    engine = MatchEngine(
+        match.teams,
+        ball,
+        num_matches=num_envs,
+        seed=seed,
+        log_passes=log_passes,
+    )
+    observations = ObservationBuilder(engine)
+
+    print(f"Evaluating {num_matches} matches ({num_envs} at a time)...")
+    results = []
+    start = time.perf_counter()
+    while len(results) < num_matches:
+        scores = play_matches(match, engine, observations)
+        results.extend(scores[: num_matches - len(results)].tolist())
+        print(f"{len(results)}/{num_matches} matches played")
+    elapsed = time.perf_counter() - start
+
+    scores = np.array(results)
+    names = [team.name for team in match.teams]
+    summary = {
+        "matches": num_matches,
+        "wins": {
+            names[0]: int((scores[:, 0] > scores[:, 1]).sum()),
+            names[1]: int((scores[:, 1] > scores[:, 0]).sum()),
+        },
+        "draws": int((scores[:, 0] == scores[:, 1]).sum()),
+        "mean_goals": {
+            name: float(scores[:, team].mean())
+            for team, name in enumerate(names)
+        },
+        "elapsed_s": round(elapsed, 2),
+        "matches_per_min": round(num_matches / elapsed * 60, 2),
+    }
+    print(
+        f"{names[0]} wins: {summary['wins'][names[0]]}, "
+        f"{names[1]} wins: {summary['wins'][names[1]]}, "
+        f"draws: {summary['draws']}"
+    )
+    print(
+        f"Mean goals: {names[0]} {summary['mean_goals'][names[0]]:.2f} - "
+        f"{names[1]} {summary['mean_goals'][names[1]]:.2f}"
+    )
+    print(
+        f"Played in {elapsed:.1f} s "
+        f"({summary['matches_per_min']:.1f} matches/min)"
+    )
+
+    summary["scores"] = results
+    if output:
+        with open(output, "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary
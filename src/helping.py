@@ -1,35 +1,7 @@
-import csv
-import os
-
 from . import constants
 from .models.players import Defender, Goalkeeper, Midfielder
 
 
-def get_last_episode(filename="scores.csv"):
-    """Return the last recorded episode number from file (or 0 if none)."""
-    if not os.path.exists(filename):
-        return 0
-    try:
-        with open(filename, "r") as f:
-            lines = f.readlines()
-            if len(lines) <= 1:  # only header
-                return 0
-            last_line = lines[-1].strip().split(",")
-            return int(last_line[0])
-    except Exception:
-        return 0
-
-
-def append_score(episode, real_madrid, kairat, filename="scores.csv"):
-    """Append one episode's score to file."""
-    file_exists = os.path.exists(filename)
-    with open(filename, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists or os.stat(filename).st_size == 0:
-            writer.writerow(["Episode", "Real Madrid", "Kairat"])
-        writer.writerow([episode, real_madrid.score, kairat.score])
-
-
 def get_player_state(player, ball, team, opponent_team):
     """Gets the state for a player based on their type."""
     if isinstance(player, Goalkeeper):
@@ -80,7 +52,9 @@ def calculate_reward(
 
     # Main game objective rewards
     if goal_scored_team_name:
-        reward += 5 if goal_scored_team_name == team_name.lower() else -5
+        # Names may come as "Real Madrid" or "real_madrid"
+        scored = goal_scored_team_name.lower().replace(" ", "_")
+        reward += 5 if scored == team_name.lower().replace(" ", "_") else -5
     elif player.can_reach_ball(ball):
         reward += 0.3
     elif player.distance_to(ball.position) < 150:
@@ -0,0 +1,164 @@
+"""Switchable per-phase timing for the hot paths.
+
+Code marks its phases with ``with instrument.phase("physics"):`` blocks or
+the ``@instrument.timed("learn")`` decorator. While instrumentation is off
+(the default) a phase is a shared no-op context manager and a timed
+function only pays for one flag check. Once ``enable`` is called, every
+phase adds its duration and a call count to process-wide totals, and
+optionally a Chrome trace event (load the file in chrome://tracing or
+Perfetto). Phases may nest, e.g. pass-prediction runs inside physics, so
+totals are inclusive.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+PHASES = (
+    "observe",
+    "act",
+    "learn",
+    "physics",
+    "pass-prediction",
+    "logging",
+    "render",
+)
+
+_NULL_PHASE = contextlib.nullcontext()
+
+
+class Instrumentation:
+    """Cumulative time and call counts per phase, plus an optional trace."""
+
+    def __init__(self, max_trace_events=2_000_000):
+        self.enabled = False
+        self.summary_interval = 0
+        self.max_trace_events = max_trace_events
+        self.trace_events = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def enable(self, summary_interval=0, trace=False):
+        """Start recording.
+
+        Args:
+            summary_interval: Print a summary every this many episodes
+                (see ``episode_finished``); 0 disables periodic summaries.
+            trace: Also keep Chrome trace events for ``write_trace``.
+        """
+        self.summary_interval = summary_interval
+        self.trace_events = [] if trace else None
+        self.reset()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.totals = defaultdict(int)  # Nanoseconds
+            self.counts = defaultdict(int)
+            self.started = time.perf_counter_ns()
+
+    def phase(self, name):
+        """Context manager timing one occurrence of phase ``name``."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return self._timing(name)
+
+    @contextlib.contextmanager
+    def _timing(self, name):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter_ns())
+
+    def timed(self, name):
+        """Decorator timing every call of a function as phase ``name``."""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, start, time.perf_counter_ns())
+
+            return wrapper
+
+        return decorator
+
+    def record(self, name, start, end):
+        with self._lock:
+            self.totals[name] += end - start
+            self.counts[name] += 1
+            events = self.trace_events
+            if events is not None and len(events) < self.max_trace_events:
+                events.append(
+                    {
+                        "name": name,
+                        "ph": "X",
+                        "ts": start / 1e3,
+                        "dur": (end - start) / 1e3,
+                        "pid": os.getpid(),
+                        "tid": threading.get_ident(),
+                    }
+                )
+
+    def summary(self):
+        """Per-phase calls, total seconds, mean milliseconds and share of
+        the wall time since the last reset."""
+        with self._lock:
+            wall = time.perf_counter_ns() - self.started
+            names = [n for n in PHASES if n in self.totals]
+            names += sorted(set(self.totals) - set(PHASES))
+            return {
+                name: {
+                    "calls": self.counts[name],
+                    "total_s": self.totals[name] / 1e9,
+                    "mean_ms": self.totals[name] / self.counts[name] / 1e6,
+                    "share": self.totals[name] / wall if wall else 0.0,
+                }
+                for name in names
+            }
+
+    def print_summary(self, title="Phase timings"):
+        summary = self.summary()
+        print(f"--- {title} ---")
+        print(
+            f"{'phase':<16}{'calls':>10}{'total s':>10}{'mean ms':>10}{'%':>7}"
+        )
+        for name, row in summary.items():
+            print(
+                f"{name:<16}{row['calls']:>10}{row['total_s']:>10.2f}"
+                f"{row['mean_ms']:>10.3f}{row['share'] * 100:>7.1f}"
+            )
+
+    def episode_finished(self, episode):
+        """Print the cumulative summary every ``summary_interval`` episodes."""
+        if (
+            self.enabled
+            and self.summary_interval
+            and episode % self.summary_interval == 0
+        ):
+            self.print_summary(f"Phase timings after episode {episode}")
+
+    def write_trace(self, path):
+        """Write the recorded events as a Chrome trace-event JSON file."""
+        with self._lock:
+            events = list(self.trace_events or [])
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+instrumentation = Instrumentation()
+phase = instrumentation.phase
+timed = instrumentation.timed
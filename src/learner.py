@@ -0,0 +1,85 @@
+"""Asynchronous learner running on its own thread."""
+
+import copy
+import threading
+import time
+
+
+class AsyncLearner:
+    """Trains agents in the background while the simulation keeps acting.
+
+    The learner thread calls ``replay`` on every agent in a loop, at its own
+    rate, and every ``publish_interval`` rounds publishes a versioned
+    snapshot of the trained weights. Actors pick actions with a separate
+    ``actor_dqn`` copy and load the newest snapshot through ``refresh``, so
+    acting never waits for gradient computation.
+
+    ``step_lock`` is held around every update; hold it to read the
+    networks, optimizers and replay memories in a consistent state.
+    """
+
+    def __init__(self, agents, publish_interval=10, pause=0.001):
+        self.agents = list(agents)
+        self.publish_interval = publish_interval
+        self.pause = pause
+        self.version = 0
+        self.updates = 0
+        self._snapshot = None
+        self._seen_version = 0
+        self._lock = threading.Lock()
+        self.step_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="learner", daemon=True
+        )
+        for agent in self.agents:
+            agent.actor_dqn = copy.deepcopy(agent.dqn)
+            agent.weights_version += 1
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread and let the agents act with the trained weights."""
+        self._stop.set()
+        self._thread.join()
+        for agent in self.agents:
+            agent.actor_dqn = agent.dqn
+            agent.weights_version += 1
+
+    def refresh(self):
+        """Load the newest snapshot into the actor networks.
+
+        Returns True if a new version was loaded.
+        """
+        if self.version == self._seen_version:
+            return False
+        with self._lock:
+            snapshot, version = self._snapshot, self.version
+        for agent, state_dict in zip(self.agents, snapshot):
+            agent.actor_dqn.load_state_dict(state_dict)
+            agent.weights_version += 1
+        self._seen_version = version
+        return True
+
+    def _run(self):
+        rounds = 0
+        while not self._stop.is_set():
+            for agent in self.agents:
+                with self.step_lock:
+                    agent.replay()
+            self.updates += len(self.agents)
+            rounds += 1
+            if rounds % self.publish_interval == 0:
+                self._publish()
+            time.sleep(self.pause)
+
+    def _publish(self):
+        snapshot = [
+            {k: v.detach().clone() for k, v in agent.dqn.state_dict().items()}
+            for agent in self.agents
+        ]
+        with self._lock:
+            self._snapshot = snapshot
+            self.version += 1
@@ -2,20 +2,127 @@ import os
 import sys
 import time
 
+import numpy as np
 import pygame
-from pygame import Vector2
 
-from . import constants, helping
+from . import constants, instrument
 from .database import init_db
+from .engine import MatchEngine
+from .environment import match_rewards
+from .inference import BatchedInference
+from .learner import AsyncLearner
 from .models.ball import Ball
-from .models.players import Defender, Goalkeeper, Midfielder
+from .models.match import MatchState
 from .models.team import Team
-from .statistics import create_pass_network
-from .utils import draw_field, draw_scores, draw_timer
+from .observation import ObservationBuilder
+from .recording import MatchRecorder
+from .seeding import seed_everything
+from .statistics import get_pass_network
+from .utils import (
+    DirtyRects,
+    draw_field,
+    draw_scores,
+    draw_timer,
+    render_text,
+)
 
+MAX_FRAME_TIME = 0.25  # Longest real time simulated after one frame
 
-def run_simulation(load_models=False):
-    """Runs the simulation with graphical output."""
+
+def load_trained_models(players):
+    """Load every player's saved model for inference, where one exists."""
+    print("Loading pre-trained models for simulation...")
+    for player in players:
+        model_path = f"models/{player.name.replace(' ', '_')}_dqn.pth"
+        if os.path.exists(model_path):
+            try:
+                player.load_model(model_path, for_training=False)
+            except Exception as e:
+                print(f"Could not load model for {player.name}: {e}")
+        else:
+            print(
+                f"Warning: Model file not found for {player.name}. Using untrained model."
+            )
+
+
+def simulate_tick(
+    match,
+    engine,
+    observations,
+    policy,
+    actions,
+    previous,
+    learner,
+    round_over,
+):
+    """Observe, learn, act and step the physics of one simulated tick.
+
+    ``previous`` is the transition returned by the last call (None at the
+    start), which is completed with this tick's states and remembered.
+    ``round_over`` says this is the last tick of the round, so its
+    transition is done like one that ends in a goal.
+
+    Returns:
+        The index of the team that scored on this tick, or -1, and the
+        states, actions, rewards and done flag of this tick.
+    """
+    engine.sync()
+    if learner is not None:
+        learner.refresh()
+
+    with instrument.phase("observe"):
+        observation = observations.build()
+        states = observations.player_states()
+    if previous is not None:
+        prev_states, prev_actions, prev_rewards, done = previous
+        for i, player in enumerate(match.players):
+            with instrument.phase("learn"):
+                player.remember(
+                    prev_states[i],
+                    prev_actions[i],
+                    prev_rewards[i],
+                    states[i],
+                    done,
+                )
+            player.decay_epsilon()
+            if learner is None:
+                player.replay()
+    with instrument.phase("act"):
+        policy.refresh()
+        actions[:] = policy.act(observation)
+
+    # Batched physics: actions, positioning, ball and goals
+    with instrument.phase("physics"):
+        scorers = engine.step(actions)
+    scorer = int(scorers[0])
+    with instrument.phase("observe"):
+        rewards = match_rewards(engine, scorers)[0]
+    done = round_over or scorer >= 0
+    return scorer, (states, actions[0].tolist(), rewards, done)
+
+
+def run_simulation(
+    load_models=False,
+    async_learner=False,
+    seed=None,
+    record=None,
+    sim_speed=1.0,
+):
+    """Runs the simulation with graphical output.
+
+    The match advances in fixed ticks of ``1 / FPS`` simulated seconds,
+    ``sim_speed`` simulated seconds per real second (up/down double or
+    halve it). Frames are drawn independently, interpolating between the
+    last two ticks, so the frame rate never changes how a match plays out;
+    when ticks cannot keep up the match runs slower instead of skipping.
+
+    With ``async_learner`` the players train on an ``AsyncLearner`` thread
+    instead of inside the frame loop. ``seed`` seeds every random number
+    generator. ``record`` is the path of a ``recording`` file receiving
+    every simulated tick.
+    """
+    if seed is not None:
+        seed_everything(seed)
     init_db()
     pygame.init()
     pygame.display.set_caption("Soccer Simulation")
@@ -23,6 +130,7 @@ def run_simulation(load_models=False):
         (constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
     )
     CLOCK = pygame.time.Clock()
+    renderer = DirtyRects(SCREEN)
 
     # Initialize game objects
     real_madrid = Team("Real Madrid", constants.RED, 0.8, 0.7)
@@ -36,56 +144,67 @@ def run_simulation(load_models=False):
         constants.BALL_COLOR,
     )
 
-    pass_network = create_pass_network()
+    match = MatchState((real_madrid, kairat), ball)
+    engine = MatchEngine(match.teams, ball)
+    observations = ObservationBuilder(engine)
+    actions = np.zeros((1, len(all_players)), dtype=np.int64)
+    recorder = None
+    if record:
+        recorder = MatchRecorder(
+            record,
+            engine,
+            match.teams,
+            fps=constants.FPS,
+            metadata={"seed": seed},
+        )
+
+    # Build the shared pass network now rather than on the first kick
+    get_pass_network()
     if load_models:
-        print("Loading pre-trained models for simulation...")
-        for player in all_players:
-            model_path = f"models/{player.name.replace(' ', '_')}_dqn.pth"
-            if os.path.exists(model_path):
-                try:
-                    player.load_model(model_path, for_training=False)
-                except Exception as e:
-                    print(f"Could not load model for {player.name}: {e}")
-            else:
-                print(
-                    f"Warning: Model file not found for {player.name}. Using untrained model."
-                )
+        load_trained_models(all_players)
+
+    learner = AsyncLearner(all_players).start() if async_learner else None
+    policy = BatchedInference(all_players)
 
-    # Game state variables
+    # Game state variables, in simulated ticks
+    tick_time = 1.0 / constants.FPS
+    round_ticks = int(constants.ROUND_DURATION * constants.FPS)
     current_round = 1
-    time_offset = 0.0
-    last_time = time.time()
+    round_tick = 0
+    match_ticks = 0
+    accumulator = 0.0
+    last_time = time.perf_counter()
     countdown_active = True
-    countdown_start_time = time.time()
-    player_memory = {}
+    countdown_start_time = time.perf_counter()
+    transition = None
+    previous_positions = engine.positions[0].copy()
+    previous_ball = engine.ball_position[0].copy()
 
     running = True
     while running:
-        current_time = time.time()
-        delta_time = current_time - last_time
+        current_time = time.perf_counter()
+        frame_time = min(current_time - last_time, MAX_FRAME_TIME)
         last_time = current_time
 
-        if not countdown_active:
-            time_offset += delta_time
-
-        round_elapsed_time = (
-            time_offset - (current_round - 1) * constants.ROUND_DURATION
-        )
-
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
                 running = False
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_UP:
+                sim_speed *= 2
+                print(f"Simulation speed: {sim_speed:g}x")
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_DOWN:
+                sim_speed /= 2
+                print(f"Simulation speed: {sim_speed:g}x")
 
         if countdown_active:
             countdown_elapsed = current_time - countdown_start_time
             countdown_left = constants.COUNTDOWN_TIME - countdown_elapsed
-            draw_field(SCREEN)
-            draw_scores(SCREEN, real_madrid, kairat)
-            draw_timer(SCREEN, time_offset)
             if countdown_left > 0:
-                font = pygame.font.SysFont(None, 96)
-                text = font.render(
-                    str(int(countdown_left) + 1), True, constants.WHITE
+                draw_field(SCREEN)
+                draw_scores(SCREEN, real_madrid, kairat)
+                draw_timer(SCREEN, match_ticks / constants.FPS)
+                text = render_text(
+                    str(int(countdown_left) + 1), constants.WHITE, 96
                 )
                 SCREEN.blit(
                     text,
@@ -95,28 +214,87 @@ def run_simulation(load_models=False):
                     ),
                 )
                 pygame.display.flip()
+                renderer.invalidate()
                 CLOCK.tick(constants.FPS)
                 continue
-            else:
-                countdown_active = False
-                last_time = time.time()
+            countdown_active = False
+            accumulator = 0.0
+            frame_time = 0.0
 
-        if round_elapsed_time >= constants.ROUND_DURATION:
+        # Advance the match by whole ticks; a slow frame only means more
+        # ticks before the next one, never a longer tick
+        accumulator += frame_time * sim_speed
+        scorer = -1
+        while (
+            accumulator >= tick_time and scorer < 0 and round_tick < round_ticks
+        ):
+            previous_positions[:] = engine.positions[0]
+            previous_ball[:] = engine.ball_position[0]
+            scorer, transition = simulate_tick(
+                match,
+                engine,
+                observations,
+                policy,
+                actions,
+                transition,
+                learner,
+                round_tick + 1 >= round_ticks,
+            )
+            accumulator -= tick_time
+            round_tick += 1
+            match_ticks += 1
+            if scorer >= 0:
+                match.teams[scorer].score += 1
+            if recorder is not None:
+                recorder.record(
+                    actions[0], scorer, [team.score for team in match.teams]
+                )
+
+        if scorer >= 0:
+            goal_scored_team_name = (
+                match.teams[scorer].name.lower().replace(" ", "_")
+            )
+            print(f"Goal for {goal_scored_team_name}!")
+            engine.reset()
+            engine.sync()
+            draw_field(SCREEN)
+            text = render_text(
+                f"GOAL for {goal_scored_team_name.upper()}!", (255, 255, 0), 96
+            )
+            SCREEN.blit(
+                text,
+                (
+                    constants.FIELD_WIDTH // 2 - 250,
+                    constants.FIELD_HEIGHT // 2 - 50,
+                ),
+            )
+            draw_scores(SCREEN, real_madrid, kairat)
+            pygame.display.flip()
+            renderer.invalidate()
+            pygame.time.wait(2000)
+            # The pause is not match time; don't bank it in the accumulator
+            accumulator = 0.0
+            last_time = time.perf_counter()
+            previous_positions[:] = engine.positions[0]
+            previous_ball[:] = engine.ball_position[0]
+            countdown_active = True
+            countdown_start_time = time.perf_counter()
+            continue
+
+        if round_tick >= round_ticks:
             if current_round < constants.MAX_ROUNDS:
                 current_round += 1
-                for team in (real_madrid, kairat):
-                    team.reset_positions()
-                ball.position = Vector2(
-                    constants.FIELD_WIDTH // 2, constants.FIELD_HEIGHT // 2
-                )
-                ball.velocity = Vector2(0, 0)
+                round_tick = 0
+                engine.reset()
+                engine.sync()
+                previous_positions[:] = engine.positions[0]
+                previous_ball[:] = engine.ball_position[0]
                 countdown_active = True
-                countdown_start_time = time.time()
+                countdown_start_time = time.perf_counter()
                 continue
             else:
                 draw_field(SCREEN)
-                font = pygame.font.SysFont(None, 72)
-                text = font.render("GAME OVER", True, (255, 0, 0))
+                text = render_text("GAME OVER", (255, 0, 0), 72)
                 SCREEN.blit(
                     text,
                     (
@@ -129,130 +307,29 @@ def run_simulation(load_models=False):
                 running = False
                 continue
 
-        goal_scored_team_name = None
-
-        for player in all_players:
-            team = real_madrid if player in real_madrid.team_members else kairat
-            opponent_team = kairat if team is real_madrid else real_madrid
-            current_state = helping.get_player_state(
-                player, ball, team, opponent_team
-            )
-            if player in player_memory:
-                prev_state, prev_action = player_memory[player]
-                reward = helping.calculate_reward(
-                    player,
-                    ball,
-                    team.team_members,
-                    goal_scored_team_name,
-                    team.name,
-                )
-                done = (
-                    round_elapsed_time >= constants.ROUND_DURATION
-                    or goal_scored_team_name is not None
-                )
-                player.remember(
-                    prev_state, prev_action, reward, current_state, done
-                )
-                if hasattr(player, "replay"):
-                    player.replay()
-            action = player.choose_action(current_state)
-            player_memory[player] = (current_state, action)
-            if isinstance(player, Goalkeeper):
-                player.update(
-                    action,
-                    ball,
-                    constants.FIELD_WIDTH,
-                    constants.FIELD_HEIGHT,
-                    team.team_members,
-                    opponent_team.team_members,
-                )
-            elif isinstance(player, Defender):
-                player.update(
-                    action,
-                    ball,
-                    constants.FIELD_WIDTH,
-                    constants.FIELD_HEIGHT,
-                    team.team_members,
-                    opponent_team.team_members,
-                )
-            else:
-                player.update(
-                    action,
-                    ball,
-                    team.team_members,
-                    opponent_team.team_members,
-                    constants.FIELD_WIDTH,
-                    constants.FIELD_HEIGHT,
-                    constants.SPEED,
-                )
-
-        for player in all_players:
-            team = real_madrid if player in real_madrid.team_members else kairat
-            if isinstance(player, Midfielder):
-                player.separate_from_others(
-                    team.team_members, min_distance=120, push_strength=2.0
-                )
-            else:
-                player.separate_from_others(team.team_members)
-            player.stay_in_zone(constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
-
-        ball.move()
-        ball.check_bounds(constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
-
-        goal_top = (constants.FIELD_HEIGHT - constants.GOAL_HEIGHT) // 2
-        goal_bottom = (constants.FIELD_HEIGHT + constants.GOAL_HEIGHT) // 2
-        if (
-            ball.position.x - ball.radius <= 0
-            and goal_top <= ball.position.y <= goal_bottom
-        ):
-            kairat.score += 1
-            goal_scored_team_name = "kairat"
-        elif (
-            ball.position.x + ball.radius >= constants.FIELD_WIDTH
-            and goal_top <= ball.position.y <= goal_bottom
-        ):
-            real_madrid.score += 1
-            goal_scored_team_name = "real_madrid"
-
-        if goal_scored_team_name:
-            print(f"Goal for {goal_scored_team_name}!")
-            ball.position = Vector2(
-                constants.FIELD_WIDTH // 2, constants.FIELD_HEIGHT // 2
-            )
-            ball.velocity = Vector2(0, 0)
-            for p in all_players:
-                p.position = p.start_position.copy()
-                p.velocity = Vector2(0, 0)
-            player_memory.clear()
-            draw_field(SCREEN)
-            font = pygame.font.SysFont(None, 96)
-            text = font.render(
-                f"GOAL for {goal_scored_team_name.upper()}!",
-                True,
-                (255, 255, 0),
+        # Draw between the last two ticks, by the fraction of the next tick
+        # already accumulated
+        with instrument.phase("render"):
+            alpha = accumulator / tick_time
+            positions = previous_positions + alpha * (
+                engine.positions[0] - previous_positions
             )
-            SCREEN.blit(
-                text,
-                (
-                    constants.FIELD_WIDTH // 2 - 250,
-                    constants.FIELD_HEIGHT // 2 - 50,
-                ),
+            ball_position = previous_ball + alpha * (
+                engine.ball_position[0] - previous_ball
             )
-            draw_scores(SCREEN, real_madrid, kairat)
-            pygame.display.flip()
-            pygame.time.wait(2000)
-            countdown_active = True
-            countdown_start_time = time.time()
-            continue
-
-        draw_field(SCREEN)
-        for p in all_players:
-            p.draw(SCREEN)
-        ball.draw(SCREEN)
-        draw_scores(SCREEN, real_madrid, kairat)
-        draw_timer(SCREEN, time_offset)
-        pygame.display.flip()
+            renderer.begin()
+            for p, position in zip(all_players, positions):
+                renderer.add(p.draw(SCREEN, position))
+            renderer.add(ball.draw(SCREEN, ball_position))
+            renderer.add(draw_scores(SCREEN, real_madrid, kairat))
+            renderer.add(draw_timer(SCREEN, match_ticks / constants.FPS))
+            renderer.present()
         CLOCK.tick(constants.FPS)
 
+    if recorder is not None:
+        recorder.close()
+        print(f"Recorded {recorder.tick} ticks to {record}")
+    if learner is not None:
+        learner.stop()
     pygame.quit()
     sys.exit()
@@ -0,0 +1,210 @@
+"""Per-episode score and training metrics logs.
+
+``EpisodeLog`` keeps its files open and the episode counter in memory, so
+logging an episode costs the same however long the history is. Rows are
+written and flushed every ``flush_every`` episodes (by default every
+episode, so a crash loses nothing a checkpoint has counted) and when the
+log is closed (also at exit). Resuming from a checkpoint passes the
+episode count the checkpoint logged as ``start_episode``, which drops the
+rows logged after it so no episode appears twice.
+
+Files:
+    scores.csv: Episode and the score of each team, as before.
+    metrics.csv: Episode, ticks, score and mean reward per team, and the
+        epsilon and mean replay loss per team and role.
+    ``chunk_dir``: Optionally, the metrics.csv columns as NumPy arrays in
+        one ``metrics_<first episode>.npz`` file per ``chunk_episodes``.
+"""
+
+import atexit
+import csv
+import os
+
+import numpy as np
+
+SCORES_FILE = "scores.csv"
+METRICS_FILE = "metrics.csv"
+
+
+def read_last_episode(filename):
+    """The episode number on the last row of a CSV file (0 if none), read
+    from the end of the file only."""
+    try:
+        with open(filename, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            lines = f.read().splitlines()
+    except OSError:
+        return 0
+    for line in reversed(lines):
+        try:
+            return int(line.split(b",")[0])
+        except ValueError:
+            continue  # Blank line or header
+    return 0
+
+
+def drop_rows_after(filename, episode):
+    """Remove the rows of a CSV file numbered after ``episode``."""
+    if read_last_episode(filename) <= episode:
+        return
+    with open(filename, newline="") as f:
+        rows = list(csv.reader(f))
+    temporary = f"{filename}.tmp"
+    with open(temporary, "w", newline="") as f:
+        csv.writer(f).writerows(
+            row
+            for row in rows
+            if not (row and row[0].isdigit() and int(row[0]) > episode)
+        )
+    os.replace(temporary, filename)
+
+
+def drop_chunks_after(chunk_dir, episode):
+    """Remove the episodes after ``episode`` from ``metrics_*.npz`` chunks."""
+    if not os.path.isdir(chunk_dir):
+        return
+    for name in os.listdir(chunk_dir):
+        if not (name.startswith("metrics_") and name.endswith(".npz")):
+            continue
+        path = os.path.join(chunk_dir, name)
+        with np.load(path) as chunk:
+            columns = {key: chunk[key] for key in chunk.files}
+        keep = columns["Episode"] <= episode
+        if keep.all():
+            continue
+        os.remove(path)
+        if keep.any():
+            np.savez(path, **{key: v[keep] for key, v in columns.items()})
+
+
+def take_mean_loss(agents):
+    """Mean replay loss of ``agents`` since the last call, or NaN."""
+    total = sum(agent.loss_total for agent in agents)
+    count = sum(agent.loss_count for agent in agents)
+    for agent in agents:
+        agent.loss_total, agent.loss_count = 0.0, 0
+    return total / count if count else float("nan")
+
+
+class EpisodeLog:
+    """Appends one scores row and one metrics row per episode."""
+
+    def __init__(
+        self,
+        scores_file=SCORES_FILE,
+        metrics_file=METRICS_FILE,
+        chunk_dir=None,
+        flush_every=1,
+        chunk_episodes=1000,
+        start_episode=None,
+    ):
+        self.scores_file = scores_file
+        self.metrics_file = metrics_file
+        self.chunk_dir = chunk_dir
+        self.flush_every = flush_every
+        self.chunk_episodes = chunk_episodes
+        if start_episode is not None:
+            for filename in (scores_file, metrics_file):
+                drop_rows_after(filename, start_episode)
+            if chunk_dir is not None:
+                drop_chunks_after(chunk_dir, start_episode)
+        self.episode = read_last_episode(scores_file)
+        self.columns = None
+        self.scores = []
+        self.metrics = []
+        self.chunk = []
+        self._files = []
+        atexit.register(self.close)
+
+    def append(self, teams, agents, ticks, rewards=None):
+        """Log the episode just finished and return its number.
+
+        Args:
+            teams: The teams, with their final ``score``.
+            agents: The players or shared policies that were trained.
+            ticks: Length of the episode in ticks.
+            rewards: Optional (num_teams, 2) array of the sum and count of
+                the rewards handed out to each team.
+        """
+        groups = {}
+        for agent in agents:
+            groups.setdefault((agent.team_name, agent.role), []).append(agent)
+        if self.columns is None:
+            self.team_names = [team.name for team in teams]
+            self.columns = ["Episode", "Ticks"]
+            for team in teams:
+                self.columns += [f"{team.name} score", f"{team.name} reward"]
+            for team_name, role in groups:
+                self.columns += [
+                    f"{team_name} {role} epsilon",
+                    f"{team_name} {role} loss",
+                ]
+
+        self.episode += 1
+        row = [self.episode, ticks]
+        for index, team in enumerate(teams):
+            reward = float("nan")
+            if rewards is not None and rewards[index, 1]:
+                reward = rewards[index, 0] / rewards[index, 1]
+            row += [team.score, reward]
+        for members in groups.values():
+            epsilon = sum(agent.epsilon for agent in members) / len(members)
+            row += [epsilon, take_mean_loss(members)]
+
+        self.scores.append([self.episode] + [team.score for team in teams])
+        self.metrics.append(row)
+        if self.chunk_dir is not None:
+            self.chunk.append(row)
+            if len(self.chunk) >= self.chunk_episodes:
+                self.write_chunk()
+        if len(self.metrics) >= self.flush_every:
+            self.flush()
+        return self.episode
+
+    def _open(self, filename, header):
+        new = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        f = open(filename, "a", newline="")
+        writer = csv.writer(f)
+        if new:
+            writer.writerow(header)
+        self._files.append(f)
+        return f, writer
+
+    def flush(self):
+        """Write the buffered rows to the CSV files."""
+        if not self.metrics:
+            return
+        if not self._files:
+            self._scores = self._open(
+                self.scores_file, ["Episode"] + self.team_names
+            )
+            self._metrics = self._open(self.metrics_file, self.columns)
+        for (f, writer), rows in (
+            (self._scores, self.scores),
+            (self._metrics, self.metrics),
+        ):
+            writer.writerows(rows)
+            f.flush()
+        self.scores, self.metrics = [], []
+
+    def write_chunk(self):
+        if not self.chunk:
+            return
+        os.makedirs(self.chunk_dir, exist_ok=True)
+        values = np.array(self.chunk, dtype=np.float64)
+        path = os.path.join(
+            self.chunk_dir, f"metrics_{int(values[0, 0]):08d}.npz"
+        )
+        np.savez(
+            path, **{name: values[:, i] for i, name in enumerate(self.columns)}
+        )
+        self.chunk = []
+
+    def close(self):
+        self.flush()
+        if self.chunk_dir is not None:
+            self.write_chunk()
+        for f in self._files:
+            f.close()
+        self._files = []
@@ -5,31 +5,20 @@ from .. import constants
 
 
 class Ball:
+    __slots__ = ("position", "radius", "color", "velocity")
+
     def __init__(self, position: tuple, radius: int, color: tuple):
         self.position = Vector2(position)
         self.radius = radius
         self.color = color
-        self._velocity = Vector2(0, 0)
-
-    @property
-    def velocity(self):
-        return self._velocity
-
-    @velocity.setter
-    def velocity(self, value):
-        if isinstance(value, (int, float)):
-            value = Vector2(0, 0)  # auto-correct invalid velocity
-        elif not isinstance(value, Vector2):
-            print("⚠️ Velocity assigned invalid type:", type(value))
-            value = Vector2(0, 0)
-        self._velocity = value
-
-    def draw(self, screen):
-        pygame.draw.circle(
-            screen,
-            self.color,
-            (int(self.position.x), int(self.position.y)),
-            self.radius,
+        self.velocity = Vector2(0, 0)  # Always a Vector2; update in place
+
+    def draw(self, screen, position=None):
+        """Draw at ``position`` (default: the current position) and return
+        the rectangle drawn."""
+        x, y = self.position if position is None else position
+        return pygame.draw.circle(
+            screen, self.color, (int(x), int(y)), self.radius
         )
 
     def move(self):
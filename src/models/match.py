@@ -0,0 +1,15 @@
+class MatchState:
+    """The teams and ball of one match and its flat list of players.
+
+    Team scores are single integers, so a ``MatchState`` describes one
+    match only; ``VecEnv`` keeps the scores of simultaneous matches itself.
+    """
+
+    def __init__(self, teams, ball):
+        self.teams = tuple(teams)
+        self.ball = ball
+        self.players = [p for team in self.teams for p in team.team_members]
+
+    def reset_scores(self):
+        for team in self.teams:
+            team.score = 0
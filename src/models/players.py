@@ -1,6 +1,5 @@
 import math
 import random
-from collections import deque
 
 import numpy as np
 import pygame
@@ -9,7 +8,8 @@ import torch.nn as nn
 import torch.optim as optim
 from pygame.math import Vector2
 
-from .. import database, statistics
+from .. import database, instrument, statistics
+from ..replay import ReplayBuffer
 
 
 # DQN Model
@@ -27,6 +27,38 @@ class DQN(nn.Module):
 
 
 class Player:
+    # No per-instance __dict__; the role subclasses fill in the DQN slots
+    __slots__ = (
+        "name",
+        "accuracy",
+        "defence",
+        "position",
+        "initial_position",
+        "start_position",
+        "velocity",
+        "radius",
+        "color",
+        "team_name",
+        "team",
+        "role",
+        "skill",
+        "last_action",
+        "loss_total",
+        "loss_count",
+        "weights_version",
+        "state_size",
+        "action_size",
+        "dqn",
+        "actor_dqn",
+        "optimizer",
+        "memory",
+        "gamma",
+        "epsilon",
+        "epsilon_min",
+        "epsilon_decay",
+        "batch_size",
+    )
+
     def __init__(
         self, name, accuracy, defence, position, radius, color, team_name, role
     ):
@@ -39,16 +71,20 @@ class Player:
         self.radius = radius
         self.color = color
         self.team_name = team_name
+        self.team = None  # Set by Team.add_player
         self.role = role
         self.skill = statistics.assign_player_skill(role)
         self.last_action = None
-        self.pass_network = statistics.create_pass_network()
+        self.loss_total = 0.0  # Replay loss since the last episode log
+        self.loss_count = 0
+        self.weights_version = 0  # Bumped whenever actor_dqn may change
 
     def get_role(self):
         return self.role
 
     def load_model(self, path, for_training=False):
         self.dqn.load_state_dict(torch.load(path))
+        self.weights_version += 1
         if not for_training:
             self.epsilon = 0.05  # Set epsilon low for inference/simulation
         print(f"Model loaded for {self.name}")
@@ -58,34 +94,40 @@ class Player:
 
     def remember(self, state, action, reward, next_state, done):
         """Store experience in replay memory."""
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.append(state, action, reward, next_state, done)
+
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        """Store a batch of experiences, one per row, in replay memory."""
+        self.memory.extend(states, actions, rewards, next_states, dones)
 
+    @instrument.timed("learn")
     def replay(self):
         """Train the DQN using experience replay."""
         if len(self.memory) < self.batch_size:
             return
 
-        batch = random.sample(self.memory, self.batch_size)
-        states, actions, rewards, next_states, dones = zip(*batch)
-
-        states = torch.stack(states)
-        next_states = torch.stack(next_states)
-        actions = torch.tensor(actions)
-        rewards = torch.tensor(rewards)
-        dones = torch.tensor(dones, dtype=torch.float32)
-
-        # Compute Q values
-        q_values = self.dqn(states).gather(1, actions.unsqueeze(1)).squeeze(1)
-        next_q_values = self.dqn(next_states).max(1)[0]
-        targets = rewards + self.gamma * next_q_values * (1 - dones)
+        # TD loss of a sampled batch, weighted as the memory samples it
+        loss = self.memory.td_loss(self.dqn, self.gamma, self.batch_size)
 
         # Update network
-        loss = nn.MSELoss()(q_values, targets)
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
-
-        # Decay epsilon
+        if self.actor_dqn is self.dqn:
+            self.weights_version += 1
+        self.loss_total += loss.item()
+        self.loss_count += 1
+
+    def decay_epsilon(self):
+        """Take one step of the exploration schedule.
+
+        Called by the acting loop rather than by ``replay``, so epsilon
+        follows the simulated ticks even when an ``AsyncLearner`` replays
+        at its own rate. Like ``replay``, it does nothing until the memory
+        holds a batch, so exploration does not decay before learning starts.
+        """
+        if len(self.memory) < self.batch_size:
+            return
         self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
 
     def choose_action(self, state):
@@ -93,16 +135,26 @@ class Player:
             action = random.randint(0, self.action_size - 1)
         else:
             with torch.no_grad():
-                action = self.dqn(state.unsqueeze(0)).argmax().item()
+                action = self.actor_dqn(state.unsqueeze(0)).argmax().item()
         self.last_action = action
         return action
 
-    def draw(self, screen):
-        pygame.draw.circle(
-            screen,
-            self.color,
-            (int(self.position.x), int(self.position.y)),
-            self.radius,
+    def choose_actions(self, states):
+        """Epsilon-greedy actions for a batch of states, one per match."""
+        with torch.no_grad():
+            actions = self.actor_dqn(states).argmax(1)
+        explore = torch.rand(len(states)) <= self.epsilon
+        actions[explore] = torch.randint(
+            0, self.action_size, (int(explore.sum()),)
+        )
+        return actions.numpy()
+
+    def draw(self, screen, position=None):
+        """Draw at ``position`` (default: the current position) and return
+        the rectangle drawn."""
+        x, y = self.position if position is None else position
+        return pygame.draw.circle(
+            screen, self.color, (int(x), int(y)), self.radius
         )
 
     def move_towards(self, target, speed):
@@ -131,19 +183,35 @@ class Player:
 
         direction = direction.normalize()
 
-        # --- Pass Prediction ---
-        passer_role = self.get_role()
         target_player = min(
             teammates, key=lambda p: p.distance_to(target_position)
         )
-        target_role = target_player.get_role()
-        distance = self.distance_to(target_position)
-        angle = abs(direction.angle_to(Vector2(1, 0)))
-        defender_proximity = min(
-            [self.distance_to(p.position) for p in opponents]
+        self.record_pass(
+            target_player,
+            self.distance_to(target_position),
+            abs(direction.angle_to(Vector2(1, 0))),
+            min([self.distance_to(p.position) for p in opponents]),
+            self.velocity.length(),
+            target_player.velocity.length(),
         )
-        passer_speed = self.velocity.length()
-        target_speed = target_player.velocity.length()
+
+        angle_dev = (1 - self.accuracy) * 90
+        deviation = random.uniform(-angle_dev, angle_dev)
+        actual_direction = direction.rotate(math.degrees(deviation))
+        ball.velocity = actual_direction * kick_power
+
+    def record_pass(
+        self,
+        target_player,
+        distance,
+        angle,
+        defender_proximity,
+        passer_speed,
+        target_speed,
+    ):
+        """Predict the success of a pass and log it to the database."""
+        passer_role = self.get_role()
+        target_role = target_player.get_role()
 
         def discretize(value, bins):
             return bins[
@@ -185,17 +253,21 @@ class Player:
             "PlayerSkill": skill_bin,
         }
 
-        prediction, confidence, probability = statistics.predict_pass_success(
-            self.pass_network, evidence
-        )
+        with instrument.phase("pass-prediction"):
+            prediction, confidence, probability = (
+                statistics.predict_pass_success(
+                    statistics.get_pass_network(), evidence
+                )
+            )
 
-        print("--- Pass Prediction ---")
-        print(f"Passer: {self.name} ({passer_role})")
-        print(f"Target: {target_player.name} ({target_role})")
-        print(
-            f"Prediction: {prediction} (Confidence: {confidence:.2f}, Probability: {probability:.2f})"
-        )
-        print(f"Evidence: {evidence}")
+        with instrument.phase("logging"):
+            print("--- Pass Prediction ---")
+            print(f"Passer: {self.name} ({passer_role})")
+            print(f"Target: {target_player.name} ({target_role})")
+            print(
+                f"Prediction: {prediction} (Confidence: {confidence:.2f}, Probability: {probability:.2f})"
+            )
+            print(f"Evidence: {evidence}")
 
         database.save_pass(
             self.name,
@@ -215,11 +287,6 @@ class Player:
             probability,
         )
 
-        angle_dev = (1 - self.accuracy) * 90
-        deviation = random.uniform(-angle_dev, angle_dev)
-        actual_direction = direction.rotate(math.degrees(deviation))
-        ball.velocity = actual_direction * kick_power
-
     def separate_from_others(
         self, teammates, min_distance=20, push_strength=0.5
     ):
@@ -276,14 +343,17 @@ class Player:
 
 
 class Goalkeeper(Player):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs, role="Goalkeeper")
         self.start_position = self.position.copy()
         self.state_size = 8  # e.g., ball_x,y,vel_x,y, own_x,y, goal_dist_x,y
         self.action_size = 3  # move, dive, stay
         self.dqn = DQN(self.state_size, self.action_size)
+        self.actor_dqn = self.dqn  # Network that picks actions
         self.optimizer = optim.Adam(self.dqn.parameters(), lr=0.001)
-        self.memory = deque(maxlen=2000)
+        self.memory = ReplayBuffer(2000, self.state_size)
         self.gamma = 0.95
         self.epsilon = 1.0
         self.epsilon_min = 0.01
@@ -312,7 +382,7 @@ class Goalkeeper(Player):
         if random.random() <= self.epsilon:
             return random.randint(0, self.action_size - 1)
         with torch.no_grad():
-            return self.dqn(state.unsqueeze(0)).argmax().item()
+            return self.actor_dqn(state.unsqueeze(0)).argmax().item()
 
     def update(
         self, action, ball, field_width, field_height, teammates, opponents
@@ -356,14 +426,17 @@ class Goalkeeper(Player):
 
 
 class Defender(Player):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs, role="Defender")
         self.start_position = self.position.copy()
         self.state_size = 10  # ball_x,y,vel_x,y, own_x,y, opponent_dist, goal_dist_x,y, zone_dist
         self.action_size = 4  # tackle, intercept, move_to_ball, return_to_pos
         self.dqn = DQN(self.state_size, self.action_size)
+        self.actor_dqn = self.dqn  # Network that picks actions
         self.optimizer = optim.Adam(self.dqn.parameters(), lr=0.001)
-        self.memory = deque(maxlen=2000)
+        self.memory = ReplayBuffer(2000, self.state_size)
         self.gamma = 0.95
         self.epsilon = 1.0
         self.epsilon_min = 0.01
@@ -399,7 +472,7 @@ class Defender(Player):
         if random.random() <= self.epsilon:
             return random.randint(0, self.action_size - 1)
         with torch.no_grad():
-            return self.dqn(state.unsqueeze(0)).argmax().item()
+            return self.actor_dqn(state.unsqueeze(0)).argmax().item()
 
     def update(
         self, action, ball, field_width, field_height, teammates, opponents
@@ -436,6 +509,8 @@ class Defender(Player):
 
 
 class Midfielder(Player):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs, role="Midfielder")
         self.start_position = self.position.copy()
@@ -444,8 +519,9 @@ class Midfielder(Player):
         )
         self.action_size = 10  # 8 directions, kick, stay
         self.dqn = DQN(self.state_size, self.action_size)
+        self.actor_dqn = self.dqn  # Network that picks actions
         self.optimizer = optim.Adam(self.dqn.parameters(), lr=0.001)
-        self.memory = deque(maxlen=2000)
+        self.memory = ReplayBuffer(2000, self.state_size)
         self.gamma = 0.95
         self.epsilon = 1.0
         self.epsilon_min = 0.01
@@ -479,7 +555,7 @@ class Midfielder(Player):
         if random.random() <= self.epsilon:
             return random.randint(0, self.action_size - 1)
         with torch.no_grad():
-            return self.dqn(state.unsqueeze(0)).argmax().item()
+            return self.actor_dqn(state.unsqueeze(0)).argmax().item()
 
     def update(
         self,
@@ -525,6 +601,8 @@ class Midfielder(Player):
 
 
 class Forwards(Player):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs, role="Forwards")
         self.start_position = self.position.copy()
@@ -533,8 +611,9 @@ class Forwards(Player):
         )
         self.action_size = 10  # 8 directions, kick, stay
         self.dqn = DQN(self.state_size, self.action_size)
+        self.actor_dqn = self.dqn  # Network that picks actions
         self.optimizer = optim.Adam(self.dqn.parameters(), lr=0.001)
-        self.memory = deque(maxlen=2000)
+        self.memory = ReplayBuffer(2000, self.state_size)
         self.gamma = 0.95
         self.epsilon = 1.0
         self.epsilon_min = 0.01
@@ -567,7 +646,7 @@ class Forwards(Player):
         if random.random() <= self.epsilon:
             return random.randint(0, self.action_size - 1)
         with torch.no_grad():
-            return self.dqn(state.unsqueeze(0)).argmax().item()
+            return self.actor_dqn(state.unsqueeze(0)).argmax().item()
 
     def update(
         self,
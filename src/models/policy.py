@@ -0,0 +1,114 @@
+import torch
+import torch.optim as optim
+
+from .. import instrument
+from ..replay import ReplayBuffer
+from .players import DQN
+
+
+class SharedPolicy:
+    """One DQN, optimizer and replay memory for all same-role teammates.
+
+    The state of each member is extended with a one-hot player index so the
+    network can still tell the players apart. Batches handled by
+    ``choose_actions`` and ``remember_batch`` hold one row per member and
+    match, ordered match by match: row ``r`` belongs to member
+    ``r % len(members)``.
+    """
+
+    def __init__(self, team_name, role, members):
+        self.team_name = team_name
+        self.role = role
+        self.members = members
+        self.name = f"{team_name} {role}"
+        self.state_size = members[0].state_size
+        self.action_size = members[0].action_size
+        self.input_size = self.state_size + len(members)
+        self.dqn = DQN(self.input_size, self.action_size)
+        self.actor_dqn = self.dqn  # Network that picks actions
+        self.optimizer = optim.Adam(self.dqn.parameters(), lr=0.001)
+        self.memory = ReplayBuffer(2000 * len(members), self.input_size)
+        self.gamma = 0.95
+        self.epsilon = 1.0
+        self.epsilon_min = 0.01
+        self.epsilon_decay = 0.995
+        self.batch_size = 32 * len(members)
+        self._identity = torch.eye(len(members))
+        self.loss_total = 0.0  # Replay loss since the last episode log
+        self.loss_count = 0
+        self.weights_version = 0  # Bumped whenever actor_dqn may change
+
+    def encode(self, states):
+        """Append the one-hot member index to every row of ``states``."""
+        states = torch.as_tensor(states)
+        members = self._identity.repeat(len(states) // len(self.members), 1)
+        return torch.cat([states, members], dim=1)
+
+    def load_model(self, path, for_training=False):
+        self.dqn.load_state_dict(torch.load(path))
+        self.weights_version += 1
+        if not for_training:
+            self.epsilon = 0.05  # Set epsilon low for inference/simulation
+        print(f"Model loaded for {self.name}")
+
+    def save_model(self, path):
+        torch.save(self.dqn.state_dict(), path)
+
+    def remember_batch(self, states, actions, rewards, next_states, dones):
+        """Store a batch of experiences of all members in replay memory."""
+        self.memory.extend(
+            self.encode(states),
+            actions,
+            rewards,
+            self.encode(next_states),
+            dones,
+        )
+
+    @instrument.timed("learn")
+    def replay(self):
+        """Train the shared DQN with one batch covering every member."""
+        if len(self.memory) < self.batch_size:
+            return
+
+        # TD loss of a sampled batch, weighted as the memory samples it
+        loss = self.memory.td_loss(self.dqn, self.gamma, self.batch_size)
+
+        # Update network
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+        if self.actor_dqn is self.dqn:
+            self.weights_version += 1
+        self.loss_total += loss.item()
+        self.loss_count += 1
+
+    def decay_epsilon(self):
+        """Take one step of the exploration schedule.
+
+        Called by the acting loop rather than by ``replay``, so epsilon
+        follows the simulated ticks even when an ``AsyncLearner`` replays
+        at its own rate. Like ``replay``, it does nothing until the memory
+        holds a batch, so exploration does not decay before learning starts.
+        """
+        if len(self.memory) < self.batch_size:
+            return
+        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+
+    def choose_actions(self, states):
+        """Epsilon-greedy actions for all members in one forward pass."""
+        with torch.no_grad():
+            actions = self.actor_dqn(self.encode(states)).argmax(1)
+        explore = torch.rand(len(actions)) <= self.epsilon
+        actions[explore] = torch.randint(
+            0, self.action_size, (int(explore.sum()),)
+        )
+        return actions.numpy()
+
+
+def create_shared_policies(teams):
+    """Create one ``SharedPolicy`` per (team, role) pair, in player order."""
+    policies = []
+    for team in teams:
+        for role, members in team.members_by_role.items():
+            policies.append(SharedPolicy(team.name, role, members))
+    return policies
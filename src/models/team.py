@@ -17,6 +17,13 @@ class Team:
         self.accuracy = accuracy
         self.saves = saves
         self.team_members: list[Player] = []
+        self.members_by_role: dict[str, list[Player]] = {}
+
+    def add_player(self, player):
+        """Add a player to the team and link it back to the team."""
+        player.team = self
+        self.team_members.append(player)
+        self.members_by_role.setdefault(player.role, []).append(player)
 
     def reset_positions(self):
         for player in self.team_members:
@@ -31,7 +38,7 @@ class Team:
         y4 = [field_height * (i + 1) // 5 for i in range(4)]
         y2 = [field_height * (i + 1) // 3 for i in range(2)]
         if self.name == "Real Madrid":
-            self.team_members.append(
+            self.add_player(
                 Goalkeeper(
                     f"{self.name} GK",
                     self.accuracy,
@@ -43,7 +50,7 @@ class Team:
                 )
             )
             for i, y in enumerate(y4):
-                self.team_members.append(
+                self.add_player(
                     Defender(
                         f"{self.name} D{i + 1}",
                         self.accuracy,
@@ -54,7 +61,7 @@ class Team:
                         self.name,
                     )
                 )
-                self.team_members.append(
+                self.add_player(
                     Midfielder(
                         f"{self.name} M{i + 1}",
                         self.accuracy,
@@ -66,7 +73,7 @@ class Team:
                     )
                 )
             for i, y in enumerate(y2):
-                self.team_members.append(
+                self.add_player(
                     Forwards(
                         f"{self.name} F{i + 1}",
                         self.accuracy,
@@ -78,7 +85,7 @@ class Team:
                     )
                 )
         else:
-            self.team_members.append(
+            self.add_player(
                 Goalkeeper(
                     f"{self.name} GK",
                     self.accuracy,
@@ -90,7 +97,7 @@ class Team:
                 )
             )
             for i, y in enumerate(y4):
-                self.team_members.append(
+                self.add_player(
                     Defender(
                         f"{self.name} D{i + 1}",
                         self.accuracy,
@@ -101,7 +108,7 @@ class Team:
                         self.name,
                     )
                 )
-                self.team_members.append(
+                self.add_player(
                     Midfielder(
                         f"{self.name} M{i + 1}",
                         self.accuracy,
@@ -113,7 +120,7 @@ class Team:
                     )
                 )
             for i, y in enumerate(y2):
-                self.team_members.append(
+                self.add_player(
                     Forwards(
                         f"{self.name} F{i + 1}",
                         self.accuracy,
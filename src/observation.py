@@ -0,0 +1,98 @@
+"""Batched observations for every player of every match."""
+
+import numpy as np
+import torch
+
+from .engine import DEFENDER, GOALKEEPER
+
+MAX_STATE_SIZE = 10
+NEAR_RADIUS = 120  # Grid search radius before falling back to a full scan
+
+
+class ObservationBuilder:
+    """Builds the state vector of every player from a ``MatchEngine``.
+
+    Observations are written into preallocated (num_matches, num_players,
+    MAX_STATE_SIZE) float32 buffers. Each player's features are the first
+    ``state_size`` entries of its row, equal to what its ``get_state``
+    returns, and the rest of the row stays zero. ``build`` cycles through
+    ``num_buffers`` buffers, so the observations of the previous
+    ``num_buffers - 1`` calls stay valid, e.g. as the previous state of a
+    transition.
+    """
+
+    def __init__(self, engine, num_buffers=2):
+        self.engine = engine
+        shape = (engine.num_matches, len(engine.players), MAX_STATE_SIZE)
+        self.buffers = [
+            np.zeros(shape, dtype=np.float32) for _ in range(num_buffers)
+        ]
+        self.current = 0
+        self.state_sizes = [player.state_size for player in engine.players]
+        self.opponents = engine.team_ids[:, None] != engine.team_ids[None, :]
+        self._views = {}
+
+    def build(self):
+        """Fill the next buffer with the current observations and return it."""
+        self.current = (self.current + 1) % len(self.buffers)
+        obs = self.buffers[self.current]
+
+        engine = self.engine
+        width = engine.field_width
+        height = engine.field_height
+        x = engine.positions[..., 0]
+        y = engine.positions[..., 1]
+        ball_y = engine.ball_position[:, None, 1]
+        right = ~engine.left_side
+
+        obs[..., 0] = x / width
+        obs[..., 1] = y / height
+        obs[..., 2] = engine.ball_position[:, None, 0] / width
+        obs[..., 3] = ball_y / height
+        obs[..., 4] = engine.ball_velocity[:, None, 0] / 25
+        obs[..., 5] = engine.ball_velocity[:, None, 1] / 25
+
+        grid = engine.spatial_index()
+        nearest_opponent = grid.nearest_distances(self.opponents, NEAR_RADIUS)
+        nearest_mate = grid.nearest_distances(engine.teammates, NEAR_RADIUS)
+
+        keeper = engine.roles == GOALKEEPER
+        defender = engine.roles == DEFENDER
+        outfield = engine.is_outfield
+
+        # Goalkeeper: goal-relative distances
+        keeper_goal = np.where(right, 1.0, -x / height)
+        keeper_centre = (height / 2 - y) / height
+        # Defender: nearest opponent, own goal, ball row, defensive line
+        own_goal = np.abs(np.where(right, width, 0) - x) / width
+        ball_row = np.abs(y - ball_y) / height
+        defence_line = np.abs(x - engine.defence_x) / width
+        # Midfielder/forward: nearest teammate, goal distance, can kick
+        attack_goal = np.where(right, x / width, 1.0)
+        can_kick = engine.can_reach_ball()
+
+        obs[..., 6] = np.select(
+            [keeper, defender, outfield],
+            [keeper_goal, nearest_opponent / width, nearest_mate / width],
+        )
+        obs[..., 7] = np.select(
+            [keeper, defender, outfield],
+            [keeper_centre, own_goal, attack_goal],
+        )
+        obs[..., 8] = np.select([defender, outfield], [ball_row, can_kick])
+        obs[..., 9] = np.where(defender, defence_line, 0)
+        return obs
+
+    def player_states(self, match=0):
+        """Per-player state tensors of ``match`` from the last ``build``.
+
+        The tensors are views of the buffer, sized to each player's
+        ``state_size``, and are created once per buffer and match.
+        """
+        key = (self.current, match)
+        if key not in self._views:
+            states = torch.from_numpy(self.buffers[self.current][match])
+            self._views[key] = [
+                states[i, :size] for i, size in enumerate(self.state_sizes)
+            ]
+        return self._views[key]
@@ -0,0 +1,88 @@
+import sys
+from types import SimpleNamespace
+
+import pygame
+
+from . import constants
+from .recording import MatchReader, to_pixels
+from .utils import DirtyRects, draw_scores, draw_timer
+
+SEEK_SECONDS = 10
+
+
+def play_recording(path, speed=1.0):
+    """Plays back a match recording without running any policy.
+
+    ``speed`` is the number of recorded seconds shown per second. While
+    playing, space pauses, left/right seek by ``SEEK_SECONDS`` and up/down
+    double or halve the speed.
+    """
+    reader = MatchReader(path)
+    header = reader.header
+    fps = header["fps"]
+    total = len(reader)
+    print(f"Replaying {path}: {total} ticks ({total / fps:.0f} s)")
+
+    pygame.init()
+    pygame.display.set_caption(f"Soccer Replay - {path}")
+    SCREEN = pygame.display.set_mode(
+        (constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
+    )
+    CLOCK = pygame.time.Clock()
+    renderer = DirtyRects(SCREEN)
+
+    # Only the scores are drawn, so skip the player models (and torch)
+    teams = [SimpleNamespace(name=t["name"], score=0) for t in header["teams"]]
+    players = [(tuple(p["color"]), p["radius"]) for p in header["players"]]
+    ball_color = tuple(header["ball"]["color"])
+    ball_radius = header["ball"]["radius"]
+
+    position = 0.0  # Tick shown, fractional between frames
+    paused = False
+    running = total > 0
+    while running:
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                running = False
+            elif e.type == pygame.KEYDOWN:
+                if e.key == pygame.K_SPACE:
+                    paused = not paused
+                elif e.key == pygame.K_RIGHT:
+                    position += SEEK_SECONDS * fps
+                elif e.key == pygame.K_LEFT:
+                    position = max(0.0, position - SEEK_SECONDS * fps)
+                elif e.key == pygame.K_UP:
+                    speed *= 2
+                elif e.key == pygame.K_DOWN:
+                    speed /= 2
+        if position >= total:
+            break
+
+        record = reader[int(position)]
+        for team, score in zip(teams, record["scores"]):
+            team.score = int(score)
+
+        renderer.begin()
+        for (color, radius), (x, y) in zip(
+            players, to_pixels(record["positions"])
+        ):
+            renderer.add(
+                pygame.draw.circle(SCREEN, color, (int(x), int(y)), radius)
+            )
+        x, y = to_pixels(record["ball"])
+        renderer.add(
+            pygame.draw.circle(
+                SCREEN, ball_color, (int(x), int(y)), ball_radius
+            )
+        )
+        renderer.add(draw_scores(SCREEN, *teams))
+        renderer.add(draw_timer(SCREEN, int(position) / fps))
+        renderer.present()
+
+        CLOCK.tick(constants.FPS)
+        if not paused:
+            position += speed * fps / constants.FPS
+
+    reader.close()
+    pygame.quit()
+    sys.exit()
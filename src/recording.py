@@ -0,0 +1,298 @@
+"""Compact binary match recordings.
+
+A recording stores one fixed-dtype record per tick: ball and player
+positions in fixed point (1/4 px), every player's action, the team that
+scored on that tick (-1 for none) and the score after the tick. Records are
+written in chunks of ``chunk_ticks`` ticks. Compressed chunks store every
+coordinate and action as its own time series, positions delta-encoded over
+time, before lzma (or zlib) compression, so a 90-minute match takes a few
+megabytes. Uncompressed chunks are the raw records.
+
+File layout::
+
+    MAGIC | header length (u4) | JSON header | chunk ... | chunk index |
+    index offset (u8) | MAGIC
+
+The chunk index lists (first tick, ticks, offset, length) per chunk, so
+``MatchReader`` memory-maps the file and only decodes the chunk holding
+the requested tick. The header's ``version`` selects the record layout, so
+older recordings still read.
+"""
+
+import json
+import lzma
+import zlib
+
+import numpy as np
+
+MAGIC = b"SOCREC1\0"
+VERSION = 2  # Version 1 stored the episode as u2
+POSITION_SCALE = 4  # Fixed-point steps per pixel
+INDEX_DTYPE = np.dtype(
+    [("first", "<u8"), ("ticks", "<u4"), ("offset", "<u8"), ("length", "<u8")]
+)
+DELTA_FIELDS = ("ball", "positions")
+# name -> (compress, decompress)
+COMPRESSORS = {
+    "lzma": (lzma.compress, lzma.decompress),
+    "zlib": (lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+
+
+def record_dtype(num_players, version=VERSION):
+    return np.dtype(
+        [
+            ("tick", "<u4"),
+            ("episode", "<u2" if version == 1 else "<u4"),
+            ("ball", "<i2", (2,)),
+            ("positions", "<i2", (num_players, 2)),
+            ("actions", "u1", (num_players,)),
+            ("goal", "i1"),
+            ("scores", "u1", (2,)),
+        ]
+    )
+
+
+def to_fixed(values):
+    return np.rint(np.asarray(values) * POSITION_SCALE).astype(np.int16)
+
+
+def to_pixels(values):
+    """Convert recorded fixed-point positions back to pixels."""
+    return values.astype(np.float32) / POSITION_SCALE
+
+
+def encode_chunk(records, compression):
+    if compression == "none":
+        return records.tobytes()
+    columns = []
+    for name in records.dtype.names:
+        column = records[name].reshape(len(records), -1)
+        if name in DELTA_FIELDS:
+            # int16 arithmetic wraps, and so does the cumsum that decodes it
+            column = np.diff(column, axis=0, prepend=np.zeros_like(column[:1]))
+        # One time series after the other compresses better than rows
+        columns.append(np.ascontiguousarray(column.T).tobytes())
+    return COMPRESSORS[compression][0](b"".join(columns))
+
+
+def decode_chunk(data, dtype, ticks, compression):
+    if compression == "none":
+        return np.frombuffer(data, dtype=dtype, count=ticks)
+    raw = COMPRESSORS[compression][1](data)
+    records = np.empty(ticks, dtype=dtype)
+    offset = 0
+    for name in dtype.names:
+        field = dtype.fields[name][0]
+        count = ticks * field.itemsize // field.base.itemsize
+        column = np.frombuffer(
+            raw, dtype=field.base, count=count, offset=offset
+        )
+        column = column.reshape(-1, ticks).T
+        if name in DELTA_FIELDS:
+            column = np.cumsum(column, axis=0, dtype=column.dtype)
+        records[name] = column.reshape((ticks,) + field.shape)
+        offset += ticks * field.itemsize
+    return records
+
+
+def match_metadata(engine, teams, fps):
+    """Header fields describing the players and field of ``engine``."""
+    return {
+        "num_players": len(engine.players),
+        "fps": fps,
+        "field": [engine.field_width, engine.field_height],
+        "teams": [
+            {"name": team.name, "color": list(team.color)} for team in teams
+        ],
+        "players": [
+            {
+                "name": player.name,
+                "role": player.role,
+                "team": int(team_id),
+                "radius": player.radius,
+                "color": list(player.color),
+            }
+            for player, team_id in zip(engine.players, engine.team_ids)
+        ],
+        "ball": {
+            "radius": engine.ball.radius,
+            "color": list(engine.ball.color),
+        },
+    }
+
+
+class MatchRecorder:
+    """Writes the ticks of one match of a ``MatchEngine`` to ``path``.
+
+    Call ``record`` after every ``engine.step`` (before any reset) and
+    ``close`` at the end; the recorder is also a context manager. Set
+    ``episode`` to tag the following ticks when recording several episodes.
+    """
+
+    def __init__(
+        self,
+        path,
+        engine,
+        teams,
+        match=0,
+        fps=60,
+        chunk_ticks=4096,
+        compression="lzma",
+        metadata=None,
+    ):
+        if compression != "none" and compression not in COMPRESSORS:
+            raise ValueError(f"Unknown compression: {compression}")
+        self.engine = engine
+        self.match = match
+        self.chunk_ticks = chunk_ticks
+        self.compression = compression
+        self.dtype = record_dtype(len(engine.players), VERSION)
+        self.buffer = np.zeros(chunk_ticks, dtype=self.dtype)
+        self.count = 0
+        self.tick = 0
+        self.episode = 0
+        self.index = []
+
+        header = match_metadata(engine, teams, fps)
+        header.update(metadata or {})
+        header.update(
+            version=VERSION,
+            chunk_ticks=chunk_ticks,
+            compression=compression,
+            position_scale=POSITION_SCALE,
+        )
+        header = json.dumps(header).encode()
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.file.write(np.uint32(len(header)).tobytes())
+        self.file.write(header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, actions, goal, scores):
+        """Append the current state of the recorded match as one tick.
+
+        Args:
+            actions: The action of every player on this tick.
+            goal: Index of the team that scored on this tick, or -1.
+            scores: Score of each team after this tick.
+        """
+        row = self.buffer[self.count]
+        row["tick"] = self.tick
+        row["episode"] = self.episode
+        row["ball"] = to_fixed(self.engine.ball_position[self.match])
+        row["positions"] = to_fixed(self.engine.positions[self.match])
+        row["actions"] = actions
+        row["goal"] = goal
+        row["scores"] = scores
+        self.count += 1
+        self.tick += 1
+        if self.count == self.chunk_ticks:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered ticks as one chunk."""
+        if not self.count:
+            return
+        data = encode_chunk(self.buffer[: self.count], self.compression)
+        self.index.append(
+            (self.tick - self.count, self.count, self.file.tell(), len(data))
+        )
+        self.file.write(data)
+        self.count = 0
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        index_offset = self.file.tell()
+        self.file.write(np.array(self.index, dtype=INDEX_DTYPE).tobytes())
+        self.file.write(np.uint64(index_offset).tobytes())
+        self.file.write(MAGIC)
+        self.file.close()
+
+
+class MatchReader:
+    """Random access to a recording through a read-only memory map.
+
+    ``len(reader)`` is the number of ticks, ``reader[i]`` is one record and
+    ``reader.read(start, stop)`` a structured array of consecutive records.
+    Only the chunks overlapping the requested ticks are decoded; the most
+    recently decoded chunk is cached for sequential playback.
+    """
+
+    def __init__(self, path):
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(self.data[: len(MAGIC)]) != MAGIC or (
+            bytes(self.data[-len(MAGIC) :]) != MAGIC
+        ):
+            raise ValueError(f"{path} is not a complete match recording")
+        start = len(MAGIC)
+        header_length = int(self.data[start : start + 4].view("<u4")[0])
+        start += 4
+        self.header = json.loads(
+            bytes(self.data[start : start + header_length])
+        )
+        version = self.header.get("version", 1)
+        if version > VERSION:
+            raise ValueError(f"{path} needs a newer reader (v{version})")
+        self.dtype = record_dtype(self.header["num_players"], version)
+        self.compression = self.header["compression"]
+
+        end = len(self.data) - len(MAGIC)
+        index_offset = int(self.data[end - 8 : end].view("<u8")[0])
+        self.index = self.data[index_offset : end - 8].view(INDEX_DTYPE)
+        self.firsts = self.index["first"].astype(np.int64)
+        self._cached = (None, None)
+
+    def __len__(self):
+        if not len(self.index):
+            return 0
+        return int(self.index["first"][-1] + self.index["ticks"][-1])
+
+    def __getitem__(self, tick):
+        if tick < 0:
+            tick += len(self)
+        if not 0 <= tick < len(self):
+            raise IndexError(tick)
+        chunk = self._chunk(self._chunk_of(tick))
+        return chunk[tick - int(self.firsts[self._chunk_of(tick)])]
+
+    def _chunk_of(self, tick):
+        return int(np.searchsorted(self.firsts, tick, side="right")) - 1
+
+    def _chunk(self, number):
+        if self._cached[0] != number:
+            entry = self.index[number]
+            offset, length = int(entry["offset"]), int(entry["length"])
+            records = decode_chunk(
+                self.data[offset : offset + length],
+                self.dtype,
+                int(entry["ticks"]),
+                self.compression,
+            )
+            self._cached = (number, records)
+        return self._cached[1]
+
+    def read(self, start=0, stop=None):
+        """Records of ticks ``start`` to ``stop`` (exclusive)."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return np.empty(0, dtype=self.dtype)
+        parts = []
+        for number in range(
+            self._chunk_of(start), self._chunk_of(stop - 1) + 1
+        ):
+            first = int(self.firsts[number])
+            records = self._chunk(number)
+            parts.append(records[max(start - first, 0) : stop - first])
+        return np.concatenate(parts)
+
+    def close(self):
+        self._cached = (None, None)
+        del self.data
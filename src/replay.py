@@ -0,0 +1,242 @@
+"""Array-backed experience replay."""
+
+import threading
+
+import numpy as np
+import torch
+
+
+class ReplayBuffer:
+    """Fixed-capacity ring buffer of transitions in preallocated arrays.
+
+    States are stored as float32 rows, actions as int64 and rewards and done
+    flags as float32, so memory use is fixed at creation. Sampling draws
+    indices with replacement and gathers each column in one indexing
+    operation, which costs the same whatever the buffer size. A buffer can
+    be shared by several players with the same state size, and written and
+    sampled from different threads.
+    """
+
+    def __init__(self, capacity, state_size):
+        self.capacity = capacity
+        self.states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_size), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+        self.position = 0
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def append(self, state, action, reward, next_state, done):
+        """Store one transition, overwriting the oldest when full."""
+        with self.lock:
+            i = self.position
+            self.states[i] = state
+            self.actions[i] = action
+            self.rewards[i] = reward
+            self.next_states[i] = next_state
+            self.dones[i] = done
+            self.position = (i + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+            self._stored(i)
+
+    def extend(self, states, actions, rewards, next_states, dones):
+        """Store a batch of transitions given as arrays with a leading axis."""
+        count = len(actions)
+        if count > self.capacity:  # Only the newest transitions would survive
+            states, actions, rewards, next_states, dones = (
+                column[-self.capacity :]
+                for column in (states, actions, rewards, next_states, dones)
+            )
+            count = self.capacity
+        with self.lock:
+            indices = (self.position + np.arange(count)) % self.capacity
+            self.states[indices] = states
+            self.actions[indices] = actions
+            self.rewards[indices] = rewards
+            self.next_states[indices] = next_states
+            self.dones[indices] = dones
+            self.position = (self.position + count) % self.capacity
+            self.size = min(self.size + count, self.capacity)
+            self._stored(indices)
+
+    def _stored(self, indices):
+        """Called under the lock with the slot (or array of slots) just
+        written, before any reader can see them."""
+
+    def sample(self, batch_size):
+        """Sample a batch as (states, actions, rewards, next_states, dones)
+        tensors."""
+        with self.lock:
+            indices = np.random.randint(0, self.size, size=batch_size)
+            return self.gather(indices)
+
+    def gather(self, indices):
+        return (
+            torch.from_numpy(self.states[indices]),
+            torch.from_numpy(self.actions[indices]),
+            torch.from_numpy(self.rewards[indices]),
+            torch.from_numpy(self.next_states[indices]),
+            torch.from_numpy(self.dones[indices]),
+        )
+
+    def td_loss(self, dqn, gamma, batch_size):
+        """Mean squared TD error of ``dqn`` on a uniformly sampled batch."""
+        return td_errors(dqn, gamma, self.sample(batch_size)).pow(2).mean()
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """``ReplayBuffer`` sampled in proportion to each transition's priority.
+
+    Priorities are ``(|TD error| + epsilon) ** alpha`` and live in the leaves
+    of a sum-tree, so sampling a batch and updating the priorities of its
+    transitions cost O(batch_size * log capacity). New transitions get the
+    highest priority seen so far, so each is replayed at least once soon.
+    ``sample_prioritized`` also returns the importance-sampling weights that
+    correct for the non-uniform sampling; their exponent ``beta`` grows
+    linearly from ``beta_start`` to 1 over ``beta_steps`` samples.
+
+    Every write to a slot bumps its generation. ``td_loss`` computes the TD
+    errors outside the lock, so it only updates the priorities of slots
+    still holding the transition it sampled; a slot an actor overwrote in
+    the meantime keeps the highest priority its new transition got.
+    """
+
+    def __init__(
+        self,
+        capacity,
+        state_size,
+        alpha=0.6,
+        beta_start=0.4,
+        beta_steps=100_000,
+        epsilon=1e-3,
+    ):
+        super().__init__(capacity, state_size)
+        self.alpha = alpha
+        self.beta_start = beta_start
+        self.beta_steps = beta_steps
+        self.epsilon = epsilon
+        self.leaves = 1 << (capacity - 1).bit_length()
+        # tree[1] is the total; the children of node i are 2i and 2i + 1
+        self.tree = np.zeros(2 * self.leaves)
+        self.max_priority = 1.0
+        self.steps = 0
+        self.generations = np.zeros(capacity, dtype=np.int64)
+
+    @property
+    def beta(self):
+        progress = min(1.0, self.steps / self.beta_steps)
+        return self.beta_start + progress * (1.0 - self.beta_start)
+
+    def _set_priority(self, index, priority):
+        node = index + self.leaves
+        change = priority - self.tree[node]
+        while node:
+            self.tree[node] += change
+            node //= 2
+
+    def _set_priorities(self, indices, priorities):
+        nodes = np.asarray(indices) + self.leaves
+        self.tree[nodes] = priorities
+        while nodes[0] > 1:
+            nodes //= 2  # Repeated parents just get the same sum again
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def _stored(self, indices):
+        self.generations[indices] += 1
+        if np.ndim(indices):
+            self._set_priorities(indices, self.max_priority)
+        else:
+            self._set_priority(indices, self.max_priority)
+
+    def reset_priorities(self):
+        """Give every stored transition the highest priority."""
+        with self.lock:
+            self.tree[:] = 0
+            if self.size:
+                self._set_priorities(np.arange(self.size), self.max_priority)
+
+    def sample_prioritized(self, batch_size):
+        """Sample a batch in proportion to priority.
+
+        Returns:
+            The batch as for ``sample``, the buffer indices of its rows for
+            ``update_priorities`` and a float32 tensor of their
+            importance-sampling weights, normalized to a maximum of 1.
+        """
+        return self._sample_prioritized(batch_size)[:3]
+
+    def _sample_prioritized(self, batch_size):
+        """``sample_prioritized`` plus the generations of the sampled slots,
+        read under the same lock."""
+        with self.lock:
+            total = self.tree[1]
+            # One draw per equal slice of the total priority
+            targets = (np.arange(batch_size) + np.random.random(batch_size)) * (
+                total / batch_size
+            )
+            nodes = np.ones(batch_size, dtype=np.int64)
+            while nodes[0] < self.leaves:
+                left = 2 * nodes
+                right = targets > self.tree[left]
+                targets -= self.tree[left] * right
+                nodes = left + right
+            indices = np.minimum(nodes - self.leaves, self.size - 1)
+            probabilities = self.tree[indices + self.leaves] / total
+            weights = (self.size * probabilities) ** -self.beta
+            self.steps += 1
+            return (
+                self.gather(indices),
+                indices,
+                torch.from_numpy((weights / weights.max()).astype(np.float32)),
+                self.generations[indices],
+            )
+
+    def update_priorities(self, indices, errors, generations=None):
+        """Set the priorities of ``indices`` from their absolute TD errors.
+
+        With the ``generations`` the slots had when sampled, slots written
+        since then are left alone.
+        """
+        priorities = (np.abs(errors) + self.epsilon) ** self.alpha
+        with self.lock:
+            if generations is not None:
+                current = self.generations[indices] == generations
+                indices, priorities = indices[current], priorities[current]
+                if not len(indices):
+                    return
+            self._set_priorities(indices, priorities)
+            self.max_priority = max(self.max_priority, float(priorities.max()))
+
+    def td_loss(self, dqn, gamma, batch_size):
+        """Importance-weighted squared TD error of ``dqn`` on a batch
+        sampled by priority; the batch's priorities are updated from it."""
+        batch, indices, weights, generations = self._sample_prioritized(
+            batch_size
+        )
+        errors = td_errors(dqn, gamma, batch)
+        self.update_priorities(indices, errors.detach().numpy(), generations)
+        return (weights * errors**2).mean()
+
+
+def td_errors(dqn, gamma, batch):
+    """One-step TD errors of ``dqn`` on a batch from ``sample``."""
+    states, actions, rewards, next_states, dones = batch
+    q_values = dqn(states).gather(1, actions.unsqueeze(1)).squeeze(1)
+    next_q_values = dqn(next_states).max(1)[0]
+    targets = rewards + gamma * next_q_values * (1 - dones)
+    return q_values - targets
+
+
+def use_prioritized_replay(agents, **kwargs):
+    """Give every agent an empty ``PrioritizedReplayBuffer`` in place of its
+    replay memory, with the same capacity; ``kwargs`` go to the buffer."""
+    for agent in agents:
+        memory = agent.memory
+        agent.memory = PrioritizedReplayBuffer(
+            memory.capacity, memory.states.shape[1], **kwargs
+        )
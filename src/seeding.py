@@ -0,0 +1,35 @@
+"""Seeding of every random number generator used by the simulation."""
+
+import random
+
+import numpy as np
+import torch
+
+
+def seed_everything(seed):
+    """Seed ``random``, NumPy's global generator and torch.
+
+    This fixes player skills, pass network CPDs, network weight init,
+    exploration and replay sampling. Matches draw from their own streams,
+    see ``match_rngs``.
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    torch.manual_seed(seed)
+
+
+def spawn_seeds(seed, count):
+    """``count`` independent integer seeds derived from ``seed``.
+
+    Without a seed, the parent seed comes from NumPy's global generator, so
+    a run seeded with ``seed_everything`` stays reproducible.
+    """
+    if seed is None:
+        seed = int(np.random.randint(2**31))
+    children = np.random.SeedSequence(seed).spawn(count)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def match_rngs(seed, num_matches):
+    """One independent ``numpy.random.Generator`` per match."""
+    return [np.random.default_rng(s) for s in spawn_seeds(seed, num_matches)]
@@ -0,0 +1,188 @@
+"""Uniform-grid spatial index for player proximity queries."""
+
+import math
+
+import numpy as np
+
+
+class SpatialGrid:
+    """Buckets the players of one or more matches into square field cells.
+
+    ``rebuild`` sorts all players by cell once; queries then only look at
+    the cells around a point instead of at every player. Each match gets its
+    own block of cell ids, so one grid serves a whole batch of matches.
+    Player indices returned by queries are indices within a match.
+    """
+
+    def __init__(self, width, height, cell_size):
+        self.cell_size = cell_size
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.cells_per_match = self.cols * self.rows
+        self.max_reach = max(self.cols, self.rows)
+
+    def rebuild(self, positions):
+        """Re-bucket ``positions``, an array of shape (matches, players, 2)."""
+        num_matches, num_players = positions.shape[:2]
+        self.num_players = num_players
+        self.points = positions.reshape(-1, 2).copy()
+        self.cell_x, self.cell_y = self._cells(self.points)
+        self.match = np.repeat(np.arange(num_matches), num_players)
+        cells = (
+            self.match * self.cells_per_match
+            + self.cell_y * self.cols
+            + self.cell_x
+        )
+        self.order = np.argsort(cells, kind="stable")
+        self.counts = np.bincount(
+            cells, minlength=num_matches * self.cells_per_match
+        )
+        self.starts = np.cumsum(self.counts) - self.counts
+        self._pairs = {}
+
+    def _cells(self, points):
+        cell_x = np.clip(
+            (points[:, 0] // self.cell_size).astype(np.int64), 0, self.cols - 1
+        )
+        cell_y = np.clip(
+            (points[:, 1] // self.cell_size).astype(np.int64), 0, self.rows - 1
+        )
+        return cell_x, cell_y
+
+    def _gather(self, match, cell_x, cell_y, reach):
+        """All (query, point) pairs whose cells are within ``reach`` cells.
+
+        Returns the query index of every pair and the flat index of the
+        point, so a query sees every player of its match in those cells.
+        """
+        offsets = np.arange(-reach, reach + 1)
+        off_x = np.tile(offsets, len(offsets))
+        off_y = np.repeat(offsets, len(offsets))
+        near_x = cell_x[:, None] + off_x
+        near_y = cell_y[:, None] + off_y
+        valid = (
+            (near_x >= 0)
+            & (near_x < self.cols)
+            & (near_y >= 0)
+            & (near_y < self.rows)
+        )
+        query, k = np.nonzero(valid)
+        cells = (
+            match[query] * self.cells_per_match
+            + near_y[query, k] * self.cols
+            + near_x[query, k]
+        )
+        counts = self.counts[cells]
+        total = counts.sum()
+        sources = np.repeat(query, counts)
+        # Ragged arange over the cell ranges of the sorted players
+        first = np.repeat(
+            self.starts[cells] - (np.cumsum(counts) - counts), counts
+        )
+        return sources, self.order[first + np.arange(total)]
+
+    def pairs_within(self, radius):
+        """Pairs of different players of a match closer than ``radius``,
+        each pair once with ``i < j``.
+
+        Results are kept until the next ``rebuild``, so several queries
+        with the same radius in one tick share the work.
+
+        Returns:
+            A tuple (match, i, j, distance) of arrays, one entry per pair.
+        """
+        if radius not in self._pairs:
+            self._pairs[radius] = self._pairs_within(radius)
+        return self._pairs[radius]
+
+    def _pairs_within(self, radius):
+        reach = max(1, math.ceil(radius / self.cell_size))
+        src, dst = self._gather(self.match, self.cell_x, self.cell_y, reach)
+        once = src < dst  # Same match, so also i < j
+        src, dst = src[once], dst[once]
+        distance = np.linalg.norm(self.points[src] - self.points[dst], axis=1)
+        close = distance < radius
+        src, dst = src[close], dst[close]
+        return (
+            src // self.num_players,
+            src % self.num_players,
+            dst % self.num_players,
+            distance[close],
+        )
+
+    def nearest_distances(self, mask, radius):
+        """Distance from every player to the nearest player allowed by
+        ``mask``.
+
+        ``mask[i, j]`` says whether player ``j`` counts for player ``i``.
+        Pairs closer than ``radius`` come from the grid; players with no
+        allowed neighbour that close fall back to a scan of their match.
+
+        Returns:
+            An array of shape (matches, players), inf where no player counts.
+        """
+        num_players = self.num_players
+        nearest = np.full(len(self.points), np.inf)
+        match, i, j, distance = self.pairs_within(radius)
+        for rows, cols in ((i, j), (j, i)):
+            allowed = mask[rows, cols]
+            np.minimum.at(
+                nearest,
+                match[allowed] * num_players + rows[allowed],
+                distance[allowed],
+            )
+
+        missing = np.flatnonzero(
+            np.isinf(nearest)
+            & mask.any(axis=1)[np.arange(len(self.points)) % num_players]
+        )
+        if len(missing):
+            points = self.points.reshape(-1, num_players, 2)
+            rows = missing % num_players
+            diff = points[missing // num_players] - self.points[missing, None]
+            distance = np.linalg.norm(diff, axis=-1)
+            nearest[missing] = np.where(mask[rows], distance, np.inf).min(
+                axis=1
+            )
+        return nearest.reshape(-1, num_players)
+
+    def nearest_k(self, match, point, k, candidates=None):
+        """The ``k`` players of ``match`` nearest to ``point``.
+
+        ``candidates`` is an optional boolean mask over players. The search
+        widens ring by ring until the ``k``-th hit is provably the nearest.
+
+        Returns:
+            A tuple (indices, distances), nearest first.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        for reach in range(self.max_reach + 1):
+            indices, distance = self._around(match, point, reach)
+            if candidates is not None:
+                keep = candidates[indices]
+                indices, distance = indices[keep], distance[keep]
+            if len(indices) >= k or reach == self.max_reach:
+                best = np.argsort(distance, kind="stable")[:k]
+                if (
+                    reach == self.max_reach
+                    or distance[best[-1]] <= reach * self.cell_size
+                ):
+                    return indices[best], distance[best]
+        return indices[:0], distance[:0]
+
+    def nearest(self, match, point, candidates=None):
+        """The player of ``match`` nearest to ``point``, as (index, distance).
+
+        Returns (None, inf) if no player is a candidate.
+        """
+        indices, distance = self.nearest_k(match, point, 1, candidates)
+        if not len(indices):
+            return None, math.inf
+        return int(indices[0]), float(distance[0])
+
+    def _around(self, match, point, reach):
+        point = np.asarray(point, dtype=np.float64).reshape(1, 2)
+        cell_x, cell_y = self._cells(point)
+        _, flat = self._gather(np.array([match]), cell_x, cell_y, reach)
+        distance = np.linalg.norm(self.points[flat] - point, axis=1)
+        return flat % self.num_players, distance
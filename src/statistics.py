@@ -1,7 +1,6 @@
+import functools
+
 import numpy as np
-from pgmpy.factors.discrete import TabularCPD
-from pgmpy.inference import VariableElimination
-from pgmpy.models import DiscreteBayesianNetwork
 
 # 1. Player Roles and Skills
 PLAYER_ROLES = {
@@ -11,6 +10,21 @@ PLAYER_ROLES = {
     "Forwards": {"skill_range": (0.75, 0.98)},
 }
 
+# Evidence observed for every pass, in the axis order of the compiled table
+EVIDENCE_VARIABLES = (
+    "PasserRole",
+    "TargetRole",
+    "DistanceToTarget",
+    "AngleToTarget",
+    "DefenderProximity",
+    "PasserSpeed",
+    "TargetSpeed",
+    "PassType",
+    "Pressure",
+    "PlayerSkill",
+)
+SKILL_CONFIDENCE = {"Low": 0.7, "Medium": 0.85, "High": 0.95}
+
 
 def assign_player_skill(role):
     """Assigns a skill level to a player based on their role."""
@@ -21,6 +35,10 @@ def assign_player_skill(role):
 # 2. Bayesian Network for Pass Prediction
 def create_pass_network():
     """Creates and returns the Bayesian Network for pass success."""
+    # pgmpy takes seconds to import; load it only once a network is needed
+    from pgmpy.factors.discrete import TabularCPD
+    from pgmpy.models import DiscreteBayesianNetwork
+
     network = DiscreteBayesianNetwork(
         [
             ("PasserRole", "PassSuccess"),
@@ -173,6 +191,83 @@ def create_pass_network():
     return network
 
 
+@functools.cache
+def get_pass_network():
+    """Returns the pass network shared by the whole process.
+
+    The network is built on first use only, so every player and kick reuses
+    the same CPDs instead of building and checking its own copy.
+    """
+    return create_pass_network()
+
+
+@functools.lru_cache(maxsize=8)
+def get_inference(network):
+    """Returns the (cached) Variable Elimination engine for a network."""
+    from pgmpy.inference import VariableElimination
+
+    return VariableElimination(network)
+
+
+@functools.lru_cache(maxsize=4096)
+def _query_success_probability(network, evidence_items):
+    result = get_inference(network).query(
+        variables=["PassSuccess"],
+        evidence=dict(evidence_items),
+        show_progress=False,
+    )
+    return float(result.values[1])  # Probability of "Success"
+
+
+@functools.lru_cache(maxsize=8)
+def compile_pass_table(network):
+    """Compiles P(PassSuccess = "Success" | evidence) into a dense array.
+
+    Every parent of ``PassSuccess`` is observed when a pass is predicted, so
+    the posterior is just the matching column of its CPD. The table has one
+    axis per variable in ``EVIDENCE_VARIABLES``, indexed by state.
+
+    Returns:
+        A tuple of (table, state_indices), where ``state_indices`` maps each
+        evidence variable to a {state name: index} dictionary.
+    """
+    cpd = network.get_cpds("PassSuccess")
+    success = cpd.state_names["PassSuccess"].index("Success")
+    values = cpd.values[success]  # axes follow cpd.variables[1:]
+    parents = cpd.variables[1:]
+    table = np.ascontiguousarray(
+        values.transpose([parents.index(v) for v in EVIDENCE_VARIABLES])
+    )
+    state_indices = {
+        variable: {
+            state: i for i, state in enumerate(cpd.state_names[variable])
+        }
+        for variable in EVIDENCE_VARIABLES
+    }
+    return table, state_indices
+
+
+def evidence_indices(network, evidence):
+    """Converts an evidence dictionary into a tuple of state indices."""
+    _, state_indices = compile_pass_table(network)
+    return tuple(
+        state_indices[variable][evidence[variable]]
+        for variable in EVIDENCE_VARIABLES
+    )
+
+
+def success_probability(network, evidence):
+    """P(PassSuccess = "Success" | evidence).
+
+    Fully observed evidence is answered from the compiled table; partial
+    evidence falls back to (memoized) Variable Elimination.
+    """
+    if all(variable in evidence for variable in EVIDENCE_VARIABLES):
+        table, _ = compile_pass_table(network)
+        return float(table[evidence_indices(network, evidence)])
+    return _query_success_probability(network, tuple(sorted(evidence.items())))
+
+
 # 3. Prediction and Confidence
 def predict_pass_success(network, evidence):
     """
@@ -186,17 +281,12 @@ def predict_pass_success(network, evidence):
     Returns:
         A tuple of (prediction, confidence_score).
     """
-    inference = VariableElimination(network)
-    result = inference.query(variables=["PassSuccess"], evidence=evidence)
-
-    success_prob = result.values[1]  # Probability of "Success"
+    success_prob = success_probability(network, evidence)
 
     # Confidence score calculation (example)
     # Factors: player skill, data availability (assumed), network calibration
     player_skill_level = evidence.get("PlayerSkill", "Medium")
-    skill_confidence = {"Low": 0.7, "Medium": 0.85, "High": 0.95}.get(
-        player_skill_level, 0.8
-    )
+    skill_confidence = SKILL_CONFIDENCE.get(player_skill_level, 0.8)
 
     # A more complex model could factor in the number of data points for the given evidence
     confidence = success_prob * skill_confidence
@@ -206,6 +296,34 @@ def predict_pass_success(network, evidence):
     return prediction, confidence, success_prob
 
 
+def predict_pass_success_batch(network, indices):
+    """
+    Scores many fully observed candidate passes at once.
+
+    Args:
+        network: The trained Bayesian Network.
+        indices: Integer array of shape (n, len(EVIDENCE_VARIABLES)) with the
+                 state index of each evidence variable, as returned by
+                 ``evidence_indices``.
+
+    Returns:
+        A tuple of arrays (success, confidence, probability), where
+        ``success`` is True where the prediction is "Success".
+    """
+    table, state_indices = compile_pass_table(network)
+    indices = np.asarray(indices)
+    success_prob = table[tuple(indices.T)]
+
+    skill_states = state_indices["PlayerSkill"]
+    skill_confidence = np.empty(len(skill_states))
+    for state, i in skill_states.items():
+        skill_confidence[i] = SKILL_CONFIDENCE.get(state, 0.8)
+    skill = indices[:, EVIDENCE_VARIABLES.index("PlayerSkill")]
+    confidence = success_prob * skill_confidence[skill]
+
+    return success_prob > 0.5, confidence, success_prob
+
+
 if __name__ == "__main__":
     # --- Example Usage ---
 
@@ -223,7 +341,7 @@ if __name__ == "__main__":
     print(f"Players: {players}\n")
 
     # 2. Create the network
-    pass_network = create_pass_network()
+    pass_network = get_pass_network()
 
     # 3. Simulate a pass and predict
     pass_evidence = {
@@ -1,14 +1,101 @@
 import os
+import time
 
-from pygame import Vector2
+import numpy as np
+import torch
 
-from . import constants, helping
+from . import constants, instrument
+from .checkpoint import (
+    CHECKPOINT_FILE,
+    Checkpointer,
+    load_checkpoint,
+    restore_rng_state,
+)
+from .engine import MatchEngine
+from .environment import VecEnv, match_rewards
+from .inference import BatchedInference
+from .learner import AsyncLearner
+from .metrics import EpisodeLog
 from .models.ball import Ball
-from .models.players import Defender, Goalkeeper, Midfielder
+from .models.match import MatchState
+from .models.policy import SharedPolicy, create_shared_policies
 from .models.team import Team
+from .observation import ObservationBuilder
+from .recording import MatchRecorder
+from .replay import use_prioritized_replay
+from .seeding import seed_everything
+from .statistics import get_pass_network
 
 
-def run_training(num_episodes, speed_multiplier=10, replay_interval=10):
+def create_teams():
+    """Create both teams with their players and the match ball."""
+    real_madrid = Team("Real Madrid", constants.RED, 0.8, 0.7)
+    kairat = Team("Kairat", constants.YELLOW, 0.6, 0.5)
+    real_madrid.create_players(constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
+    kairat.create_players(constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
+    ball = Ball(
+        (constants.FIELD_WIDTH // 2, constants.FIELD_HEIGHT // 2),
+        7,
+        constants.BALL_COLOR,
+    )
+    return real_madrid, kairat, ball
+
+
+def get_model_path(agent):
+    """Model file of a player or of a role-shared policy."""
+    suffix = (
+        "_shared_dqn.pth" if isinstance(agent, SharedPolicy) else "_dqn.pth"
+    )
+    return f"models/{agent.name.replace(' ', '_')}{suffix}"
+
+
+def load_models(players):
+    """Load existing models if they exist."""
+    for player in players:
+        model_path = get_model_path(player)
+        if os.path.exists(model_path):
+            try:
+                player.load_model(model_path, for_training=True)
+            except Exception as e:
+                print(f"Could not load model for {player.name}: {e}")
+
+
+def save_models(players):
+    for player in players:
+        model_path = get_model_path(player)
+        player.save_model(model_path)
+        print(f"Saved model for {player.name} to {model_path}")
+
+
+def log_episode(log, episode, num_episodes, teams, agents, ticks, rewards=None):
+    """Report a finished episode and append it to the ``EpisodeLog``."""
+    real_madrid, kairat = teams
+    if episode % 10 == 0:
+        print(
+            f"Episode {episode}/{num_episodes} finished. "
+            f"Score: {real_madrid.name} {real_madrid.score} - "
+            f"{kairat.name} {kairat.score}"
+        )
+    log.append(teams, agents, ticks, rewards)
+    instrument.instrumentation.episode_finished(episode)
+
+
+def run_training(
+    num_episodes,
+    speed_multiplier=10,
+    replay_interval=10,
+    num_envs=1,
+    share_roles=False,
+    async_learner=False,
+    seed=None,
+    record=None,
+    checkpoint=CHECKPOINT_FILE,
+    checkpoint_every=0,
+    checkpoint_minutes=0,
+    resume=False,
+    metrics_dir=None,
+    prioritized_replay=False,
+):
     """
     Runs the simulation in headless mode for training.
 
@@ -16,194 +103,366 @@ def run_training(num_episodes, speed_multiplier=10, replay_interval=10):
         num_episodes: Number of training episodes
         speed_multiplier: How much faster to run the simulation (1 = normal speed)
         replay_interval: Call replay every N ticks.
+        num_envs: Number of matches stepped together (see ``VecEnv``).
+        share_roles: Train one ``SharedPolicy`` per (team, role) pair
+            instead of one network per player.
+        async_learner: Train on an ``AsyncLearner`` thread instead of
+            calling replay inside the tick loop.
+        seed: Seed for every random number generator, see
+            ``seeding.seed_everything``.
+        record: Path of a ``recording`` file receiving every tick of the
+            single-match training loop.
+        checkpoint: Path of the consolidated training checkpoint.
+        checkpoint_every: Checkpoint every this many episodes (0: never).
+        checkpoint_minutes: Also checkpoint when this many minutes have
+            passed since the last checkpoint (0: never).
+        resume: Restore the checkpoint and continue until ``num_episodes``
+            episodes have been played in total.
+        metrics_dir: Also write the episode metrics as chunked NumPy
+            files to this directory, see ``metrics.EpisodeLog``.
+        prioritized_replay: Sample replay batches by TD error, see
+            ``replay.PrioritizedReplayBuffer``.
     """
     print(
         f"Starting training for {num_episodes} episodes (speed: {speed_multiplier}x, replay_interval: {replay_interval})..."
     )
 
+    if seed is not None:
+        seed_everything(seed)
+
     # Initialize game objects
-    real_madrid = Team("Real Madrid", constants.RED, 0.8, 0.7)
-    kairat = Team("Kairat", constants.YELLOW, 0.6, 0.5)
-    real_madrid.create_players(constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
-    kairat.create_players(constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
+    real_madrid, kairat, ball = create_teams()
     all_players = real_madrid.team_members + kairat.team_members
+    # Build the pass network before a checkpoint can restore the generators
+    get_pass_network()
+    agents = all_players
+    if share_roles:
+        agents = create_shared_policies((real_madrid, kairat))
+    if prioritized_replay:
+        use_prioritized_replay(agents)
+    load_models(agents)
+    start_episode, rng, logged = 0, None, None
+    if resume:
+        start_episode, rng, logged = load_checkpoint(checkpoint, agents)
+    learner = AsyncLearner(agents).start() if async_learner else None
+    log = EpisodeLog(chunk_dir=metrics_dir, start_episode=logged)
+    checkpointer = None
+    if checkpoint_every or checkpoint_minutes:
+        checkpointer = Checkpointer(
+            checkpoint,
+            agents,
+            learner=learner,
+            log=log,
+            every_episodes=checkpoint_every,
+            every_minutes=checkpoint_minutes,
+        )
 
-    # Load existing models if they exist
-    for player in all_players:
-        model_path = f"models/{player.name.replace(' ', '_')}_dqn.pth"
-        if os.path.exists(model_path):
-            try:
-                player.load_model(model_path, for_training=True)
-            except Exception as e:
-                print(f"Could not load model for {player.name}: {e}")
+    if num_envs > 1 or share_roles:
+        if record:
+            print("Recording is only supported with one match; not recording.")
+        run_vectorized_training(
+            num_episodes,
+            real_madrid,
+            kairat,
+            ball,
+            num_envs,
+            replay_interval,
+            agents=agents,
+            learner=learner,
+            start_episode=start_episode,
+            checkpointer=checkpointer,
+            log=log,
+            rng=rng,
+        )
+        log.close()
+        if checkpointer is not None:
+            checkpointer.close()
+        if learner is not None:
+            learner.stop()
+        print("Training complete. Saving models...")
+        save_models(agents)
+        return
+
+    match = MatchState((real_madrid, kairat), ball)
+    engine = MatchEngine(match.teams, ball)
+    observations = ObservationBuilder(engine)
+    recorder = None
+    if record:
+        recorder = MatchRecorder(
+            record,
+            engine,
+            match.teams,
+            fps=constants.FPS,
+            metadata={"seed": seed},
+        )
+    if rng is not None:
+        restore_rng_state(rng, engine)
+    if checkpointer is not None:
+        checkpointer.engine = engine
 
-    for episode in range(num_episodes):
-        # --- Episode Setup ---
-        ball = Ball(
-            (constants.FIELD_WIDTH // 2, constants.FIELD_HEIGHT // 2),
-            7,
-            constants.BALL_COLOR,
+    for episode in range(start_episode, num_episodes):
+        if recorder is not None:
+            recorder.episode = episode
+        rewards = np.zeros((len(match.teams), 2))
+        ticks = play_episode(
+            match,
+            engine,
+            observations,
+            replay_interval=replay_interval,
+            speed_multiplier=speed_multiplier,
+            learner=learner,
+            recorder=recorder,
+            rewards=rewards,
+        )
+        log_episode(
+            log,
+            episode + 1,
+            num_episodes,
+            match.teams,
+            agents,
+            ticks,
+            rewards,
         )
-        for player in all_players:
-            player.position = player.start_position.copy()
-            player.velocity = Vector2(0, 0)
+        if checkpointer is not None:
+            checkpointer.maybe_save(episode + 1)
+
+    # --- Save Models ---
+    log.close()
+    if checkpointer is not None:
+        checkpointer.close()
+    if recorder is not None:
+        recorder.close()
+        print(f"Recorded {recorder.tick} ticks to {record}")
+    if learner is not None:
+        learner.stop()
+    print("Training complete. Saving models...")
+    save_models(all_players)
 
-        real_madrid.score = 0
-        kairat.score = 0
 
-        player_memory = {}
-        game_ticks = 0
+def play_episode(
+    match,
+    engine,
+    observations,
+    replay_interval=10,
+    speed_multiplier=10,
+    learner=None,
+    max_ticks=None,
+    tick_times=None,
+    recorder=None,
+    rewards=None,
+):
+    """Play one headless training episode on a single-match engine.
+
+    Args:
+        match: The ``MatchState`` of the teams on ``engine``.
+        engine: A ``MatchEngine`` with one match.
+        observations: The ``ObservationBuilder`` of ``engine``.
+        max_ticks: Episode length; defaults to the full match length.
+        tick_times: Optional list that receives the duration in seconds of
+            every tick.
+        recorder: Optional ``MatchRecorder`` that receives every tick.
+        rewards: Optional (num_teams, 2) array that receives the sum and
+            count of the rewards of each team.
+
+    Returns:
+        The number of ticks played.
+    """
+    players = match.players
+    actions = np.zeros((1, len(players)), dtype=np.int64)
+    if max_ticks is None:
         max_ticks = int(
             constants.ROUND_DURATION * constants.MAX_ROUNDS * constants.FPS
         )
 
-        # --- Fast, Headless Game Loop for one episode ---
-        while game_ticks < max_ticks:
-            # Process multiple ticks in a batch for speed
-            for _ in range(speed_multiplier):
-                if game_ticks >= max_ticks:
-                    break
-
-                goal_scored_team_name = None
-
-                # Player decision and action execution
-                for player in all_players:
-                    team = (
-                        real_madrid
-                        if player in real_madrid.team_members
-                        else kairat
-                    )
-                    opponent_team = (
-                        kairat if team is real_madrid else real_madrid
-                    )
-
-                    current_state = helping.get_player_state(
-                        player, ball, team, opponent_team
-                    )
-
-                    if player in player_memory:
-                        prev_state, prev_action = player_memory[player]
-                        reward = helping.calculate_reward(
-                            player,
-                            ball,
-                            team.team_members,
-                            goal_scored_team_name,
-                            team.name,
-                        )
-                        done = goal_scored_team_name is not None
+    # --- Episode Setup ---
+    policy = BatchedInference(players)
+    engine.reset()
+    match.reset_scores()
+    previous = None  # States, actions, rewards and done of the last tick
+    game_ticks = 0
 
+    # --- Fast, Headless Game Loop for one episode ---
+    while game_ticks < max_ticks:
+        # Process multiple ticks in a batch for speed
+        for _ in range(speed_multiplier):
+            if game_ticks >= max_ticks:
+                break
+            if tick_times is not None:
+                tick_start = time.perf_counter()
+
+            engine.sync()
+            if learner is not None:
+                learner.refresh()
+
+            # Player decision
+            with instrument.phase("observe"):
+                observation = observations.build()
+                states = observations.player_states()
+            if previous is not None:
+                prev_states, prev_actions, prev_rewards, done = previous
+                with instrument.phase("learn"):
+                    for i, player in enumerate(players):
                         player.remember(
-                            prev_state,
-                            prev_action,
-                            reward,
-                            current_state,
+                            prev_states[i],
+                            prev_actions[i],
+                            prev_rewards[i],
+                            states[i],
                             done,
                         )
-                        if game_ticks % replay_interval == 0:
-                            if hasattr(player, "replay"):
-                                player.replay()
-
-                    action = player.choose_action(current_state)
-                    player_memory[player] = (current_state, action)
-
-                    if isinstance(player, Goalkeeper):
-                        player.update(
-                            action,
-                            ball,
-                            constants.FIELD_WIDTH,
-                            constants.FIELD_HEIGHT,
-                            team.team_members,
-                            opponent_team.team_members,
-                        )
-                    elif isinstance(player, Defender):
-                        player.update(
-                            action,
-                            ball,
-                            constants.FIELD_WIDTH,
-                            constants.FIELD_HEIGHT,
-                            team.team_members,
-                            opponent_team.team_members,
-                        )
-                    else:
-                        player.update(
-                            action,
-                            ball,
-                            team.team_members,
-                            opponent_team.team_members,
-                            constants.FIELD_WIDTH,
-                            constants.FIELD_HEIGHT,
-                            constants.SPEED,
-                        )
+                if game_ticks % replay_interval == 0:
+                    for player in players:
+                        player.decay_epsilon()
+                        if learner is None:
+                            player.replay()
 
-                # Player positioning and constraints
-                for player in all_players:
-                    team = (
-                        real_madrid
-                        if player in real_madrid.team_members
-                        else kairat
-                    )
-                    if isinstance(player, Midfielder):
-                        player.separate_from_others(
-                            team.team_members,
-                            min_distance=120,
-                            push_strength=2.0,
-                        )
-                    else:
-                        player.separate_from_others(team.team_members)
-                    player.stay_in_zone(
-                        constants.FIELD_WIDTH, constants.FIELD_HEIGHT
-                    )
-
-                # Ball physics
-                ball.move()
-                ball.check_bounds(constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
-
-                # Goal detection
-                goal_top = (constants.FIELD_HEIGHT - constants.GOAL_HEIGHT) // 2
-                goal_bottom = (
-                    constants.FIELD_HEIGHT + constants.GOAL_HEIGHT
-                ) // 2
-                if (
-                    ball.position.x - ball.radius <= 0
-                    and goal_top <= ball.position.y <= goal_bottom
-                ):
-                    kairat.score += 1
-                    goal_scored_team_name = "kairat"
-                elif (
-                    ball.position.x + ball.radius >= constants.FIELD_WIDTH
-                    and goal_top <= ball.position.y <= goal_bottom
-                ):
-                    real_madrid.score += 1
-                    goal_scored_team_name = "real_madrid"
-
-                # Reset after goal
-                if goal_scored_team_name:
-                    ball.position = Vector2(
-                        constants.FIELD_WIDTH // 2,
-                        constants.FIELD_HEIGHT // 2,
-                    )
-                    ball.velocity = Vector2(0, 0)
-                    for p in all_players:
-                        p.position = p.start_position.copy()
-                        p.velocity = Vector2(0, 0)
-                    player_memory.clear()
-
-                game_ticks += 1
-
-        if (episode + 1) % 10 == 0:
-            print(
-                f"Episode {episode + 1}/{num_episodes} finished. "
-                f"Score: {real_madrid.name} {real_madrid.score} - "
-                f"{kairat.name} {kairat.score}"
+            with instrument.phase("act"):
+                policy.refresh()
+                actions[:] = policy.act(observation)
+
+            # Batched physics: actions, positioning, ball and goals
+            with instrument.phase("physics"):
+                scorers = engine.step(actions)
+            scorer = scorers[0]
+            with instrument.phase("observe"):
+                tick_rewards = match_rewards(engine, scorers)[0]
+            if rewards is not None:
+                rewards[:, 0] += np.bincount(
+                    engine.team_ids, tick_rewards, len(rewards)
+                )
+                rewards[:, 1] += np.bincount(
+                    engine.team_ids, None, len(rewards)
+                )
+            previous = (
+                states,
+                actions[0].tolist(),
+                tick_rewards,
+                bool(scorer >= 0),
             )
 
-        last_episode = helping.get_last_episode()
-        episode_num = last_episode + 1  # continue numbering
-        helping.append_score(episode_num, real_madrid, kairat)
+            if scorer >= 0:
+                match.teams[scorer].score += 1
+            if recorder is not None:
+                recorder.record(
+                    actions[0], scorer, [team.score for team in match.teams]
+                )
 
-    # --- Save Models ---
-    print("Training complete. Saving models...")
-    for player in all_players:
-        model_path = f"models/{player.name.replace(' ', '_')}_dqn.pth"
-        player.save_model(model_path)
-        print(f"Saved model for {player.name} to {model_path}")
+            # Reset after goal; the goal transition is already done
+            if scorer >= 0:
+                engine.reset()
+
+            game_ticks += 1
+            if tick_times is not None:
+                tick_times.append(time.perf_counter() - tick_start)
+
+    return game_ticks
+
+
+def run_vectorized_training(
+    num_episodes,
+    real_madrid,
+    kairat,
+    ball,
+    num_envs,
+    replay_interval=10,
+    agents=None,
+    learner=None,
+    start_episode=0,
+    checkpointer=None,
+    log=None,
+    rng=None,
+):
+    """Train on ``num_envs`` matches stepped together until ``num_episodes``
+    of them have been played to the end, counting ``start_episode``
+    episodes played before.
+
+    ``agents`` are the players, or the ``SharedPolicy`` objects covering
+    them. Each agent picks the actions of all its players in all matches in
+    one forward pass per tick and learns from them in one batched update,
+    unless an ``AsyncLearner`` does the learning. Finished episodes go to
+    ``log``, a new ``EpisodeLog`` by default.
+
+    ``rng`` is the generator state from ``load_checkpoint``, restored once
+    the matches exist. Checkpoints are taken when a match finishes, while
+    the others are still being played; those restart from kick-off on
+    resume, so a resumed run does not replay the uninterrupted one exactly.
+    """
+    if log is None:
+        log = EpisodeLog()
+    all_players = real_madrid.team_members + kairat.team_members
+    if agents is None:
+        agents = all_players
+    groups = []
+    for agent in agents:
+        members = agent.members if isinstance(agent, SharedPolicy) else [agent]
+        groups.append((agent, [all_players.index(p) for p in members]))
+
+    max_ticks = int(
+        constants.ROUND_DURATION * constants.MAX_ROUNDS * constants.FPS
+    )
+    teams = (real_madrid, kairat)
+    env = VecEnv(teams, ball, num_envs, max_ticks)
+    if rng is not None:
+        restore_rng_state(rng, env.engine)
+    if checkpointer is not None:
+        checkpointer.engine = env.engine
+    actions = np.zeros((num_envs, len(all_players)), dtype=np.int64)
+    # Sum of the rewards of each team in each match, and players per team
+    team_onehot = np.eye(len(teams), dtype=np.float32)[env.engine.team_ids]
+    team_rewards = np.zeros((num_envs, len(teams)))
+    team_sizes = team_onehot.sum(0)
+
+    observations = torch.from_numpy(env.reset())
+    finished_episodes = start_episode
+    tick = 0
+    while finished_episodes < num_episodes:
+        if learner is not None:
+            learner.refresh()
+        with instrument.phase("act"):
+            for agent, members in groups:
+                size = agent.state_size
+                states = observations[:, members, :size].reshape(-1, size)
+                actions[:, members] = agent.choose_actions(states).reshape(
+                    num_envs, len(members)
+                )
+
+        next_observations, rewards, dones, info = env.step(actions)
+        next_observations = torch.from_numpy(next_observations)
+
+        for agent, members in groups:
+            size = agent.state_size
+            with instrument.phase("learn"):
+                agent.remember_batch(
+                    observations[:, members, :size].reshape(-1, size),
+                    actions[:, members].reshape(-1),
+                    rewards[:, members].reshape(-1),
+                    next_observations[:, members, :size].reshape(-1, size),
+                    np.repeat(dones, len(members)),
+                )
+            if tick % replay_interval == 0:
+                agent.decay_epsilon()
+                if learner is None:
+                    agent.replay()
+
+        team_rewards += rewards @ team_onehot
+        for match, scores in zip(
+            np.flatnonzero(info["finished"]), info["scores"]
+        ):
+            if finished_episodes == num_episodes:
+                break
+            finished_episodes += 1
+            real_madrid.score, kairat.score = (int(s) for s in scores)
+            log_episode(
+                log,
+                finished_episodes,
+                num_episodes,
+                teams,
+                agents,
+                max_ticks,
+                np.stack([team_rewards[match], team_sizes * max_ticks], 1),
+            )
+            team_rewards[match] = 0
+            if checkpointer is not None:
+                checkpointer.maybe_save(finished_episodes)
+
+        observations = next_observations
+        tick += 1
@@ -1,10 +1,46 @@
+import functools
+
 import pygame
 
 from . import constants
 
 
+@functools.cache
+def field_surface():
+    """The pitch and its markings, rasterized once."""
+    surface = pygame.Surface((constants.FIELD_WIDTH, constants.FIELD_HEIGHT))
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    draw_markings(surface)
+    return surface
+
+
+@functools.cache
+def get_font(size=None):
+    """The default font at ``constants.FONT_SIZE``, or the ``SysFont`` of
+    ``size``. Fonts are loaded on first use rather than at import."""
+    pygame.font.init()
+    if size is None:
+        return pygame.font.Font(None, constants.FONT_SIZE)
+    return pygame.font.SysFont(None, size)
+
+
+@functools.lru_cache(maxsize=512)
+def render_text(text, color, size=None):
+    """Rendered ``text``, reused until the text or color changes.
+
+    ``size`` selects a ``SysFont`` size; by default the default font of
+    ``get_font`` is used.
+    """
+    return get_font(size).render(text, True, color)
+
+
 def draw_field(screen):
     """Draw soccer field and markings."""
+    screen.blit(field_surface(), (0, 0))
+
+
+def draw_markings(screen):
     screen.fill(constants.GREEN)
     # Slightly bigger size
     pygame.draw.rect(
@@ -87,22 +123,63 @@ def draw_field(screen):
 
 
 def draw_scores(screen, real_madrid, kairat):
-    real_text = constants.FONT.render(
-        f"Real Madrid: {real_madrid.score}", True, constants.RED
-    )
-    kairat_text = constants.FONT.render(
-        f"Kairat: {kairat.score}", True, constants.YELLOW
-    )
-    screen.blit(real_text, (20, 20))
-    screen.blit(
-        kairat_text, (constants.FIELD_WIDTH - kairat_text.get_width() - 20, 20)
-    )
+    """Draw both scores and return the rectangles drawn."""
+    real_text = render_text(f"Real Madrid: {real_madrid.score}", constants.RED)
+    kairat_text = render_text(f"Kairat: {kairat.score}", constants.YELLOW)
+    return [
+        screen.blit(real_text, (20, 20)),
+        screen.blit(
+            kairat_text,
+            (constants.FIELD_WIDTH - kairat_text.get_width() - 20, 20),
+        ),
+    ]
 
 
 def draw_timer(screen, elapsed_seconds):
     minutes = int(elapsed_seconds) // 60
     seconds = int(elapsed_seconds) % 60
-    time_text = constants.FONT.render(
-        f"{minutes:02}:{seconds:02}", True, constants.WHITE
-    )
-    screen.blit(time_text, (constants.FIELD_WIDTH // 2 - 25, 20))
+    time_text = render_text(f"{minutes:02}:{seconds:02}", constants.WHITE)
+    return [screen.blit(time_text, (constants.FIELD_WIDTH // 2 - 25, 20))]
+
+
+class DirtyRects:
+    """Updates only the parts of the screen that changed.
+
+    Each frame, ``begin`` paints the cached pitch back over everything drawn
+    in the previous frame, the caller draws and passes the returned
+    rectangles to ``add``, and ``present`` updates the old and new
+    rectangles on the display. After drawing over the whole screen (e.g. a
+    countdown), call ``invalidate`` so the next frame is drawn in full.
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.previous = []
+        self.current = []
+        self.full = True
+
+    def invalidate(self):
+        self.full = True
+
+    def begin(self):
+        background = field_surface()
+        if self.full:
+            self.screen.blit(background, (0, 0))
+        else:
+            for rect in self.previous:
+                self.screen.blit(background, rect, rect)
+
+    def add(self, rects):
+        """Mark a rectangle, or a list of them, as drawn this frame."""
+        if isinstance(rects, pygame.Rect):
+            self.current.append(rects)
+        else:
+            self.current.extend(rects)
+
+    def present(self):
+        if self.full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + self.current)
+        self.previous, self.current = self.current, []
+        self.full = False
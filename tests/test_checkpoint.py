@@ -0,0 +1,62 @@
+import threading
+
+import numpy as np
+import torch
+
+from src.checkpoint import Checkpointer, load_checkpoint, restore_rng_state
+from src.engine import MatchEngine
+from src.learner import AsyncLearner
+from src.train import create_teams
+
+
+def test_checkpoint_restores_agents_and_match_generators(tmp_path):
+    real_madrid, kairat, ball = create_teams()
+    players = real_madrid.team_members + kairat.team_members
+    engine = MatchEngine((real_madrid, kairat), ball, num_matches=3, seed=7)
+    for player in players:
+        states = torch.rand(40, player.state_size)
+        player.remember_batch(
+            states,
+            torch.zeros(40, dtype=torch.int64),
+            torch.ones(40),
+            states,
+            torch.zeros(40),
+        )
+        player.epsilon = 0.5
+    path = tmp_path / "checkpoint.pt"
+    checkpointer = Checkpointer(str(path), players, engine=engine)
+    checkpointer.save(4)
+    checkpointer.close()
+    expected = [rng.uniform(size=3) for rng in engine.rngs]
+
+    real_madrid, kairat, ball = create_teams()
+    restored = real_madrid.team_members + kairat.team_members
+    engine = MatchEngine((real_madrid, kairat), ball, num_matches=3, seed=8)
+    episode, rng, logged = load_checkpoint(str(path), restored)
+    restore_rng_state(rng, engine)
+
+    assert episode == 4
+    assert logged is None
+    for rng, draws in zip(engine.rngs, expected):
+        np.testing.assert_array_equal(rng.uniform(size=3), draws)
+    for player, copy in zip(players, restored):
+        assert copy.epsilon == 0.5
+        assert len(copy.memory) == 40
+        for name, tensor in player.dqn.state_dict().items():
+            torch.testing.assert_close(copy.dqn.state_dict()[name], tensor)
+
+
+def test_snapshot_waits_for_the_learner_step(tmp_path):
+    real_madrid, _, _ = create_teams()
+    learner = AsyncLearner(real_madrid.team_members)  # Not started
+    checkpointer = Checkpointer(
+        str(tmp_path / "checkpoint.pt"), learner.agents, learner=learner
+    )
+    saver = threading.Thread(target=checkpointer.save, args=(1,))
+    with learner.step_lock:
+        saver.start()
+        saver.join(timeout=0.2)
+        assert saver.is_alive()
+    saver.join()
+    checkpointer.close()
+    assert (tmp_path / "checkpoint.pt").exists()
@@ -0,0 +1,35 @@
+import sqlite3
+import threading
+
+from src.database import PassWriter
+
+ROW = ("P", "Forwards", "T", "Midfielder", 1.0, 2.0, 3.0, 4.0, 5.0)
+ROW += ("Ground", "Low", 0.5, "Success", 0.9, 0.8, "2024-01-01")
+
+
+def finishes(target, timeout=5):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def test_failed_batch_is_dropped_without_stopping_the_writer(tmp_path):
+    path = tmp_path / "passes.db"
+    writer = PassWriter(str(path), batch_size=2)
+    writer.write(ROW[:3])  # Wrong number of values: executemany raises
+    writer.write(ROW)
+    assert finishes(writer.flush)
+    writer.write(ROW)
+    assert finishes(writer.close)
+
+    count = sqlite3.connect(path).execute("SELECT COUNT(*) FROM passes")
+    assert count.fetchone()[0] == 1
+
+
+def test_unopenable_database_does_not_block_writes(tmp_path):
+    writer = PassWriter(str(tmp_path), batch_size=2, max_queued=4)
+    for _ in range(10):
+        writer.write(ROW)
+    assert finishes(writer.flush)
+    assert finishes(writer.close)
@@ -0,0 +1,35 @@
+import numpy as np
+
+from src.distributed import record_passes
+from src.engine import MatchEngine
+from src.models.players import Player
+from src.train import create_teams
+
+
+def test_deferred_passes_are_recorded_like_direct_ones(monkeypatch):
+    logged = []
+    monkeypatch.setattr(
+        Player,
+        "record_pass",
+        lambda self, target, *inputs: logged.append(
+            (self.name, target.name) + inputs
+        ),
+    )
+    results = []
+    for defer in (False, True):
+        real_madrid, kairat, ball = create_teams()
+        engine = MatchEngine((real_madrid, kairat), ball, seed=0)
+        if defer:
+            engine.deferred_passes = []
+        for index in np.flatnonzero(engine.is_outfield)[:4]:
+            engine.positions[0, index] = engine.ball_position[0] - (10, 5)
+            engine.kick(0, index, np.array([900.0, 350.0]), 20)
+        if defer:
+            assert not logged
+            record_passes(engine.players, engine.deferred_passes)
+        results.append((logged[:], engine.ball_velocity[0].copy()))
+        logged.clear()
+
+    assert len(results[0][0]) == 4
+    assert results[0][0] == results[1][0]
+    np.testing.assert_array_equal(results[0][1], results[1][1])
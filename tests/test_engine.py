@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+from src import constants
+from src.engine import MatchEngine
+from src.models.players import Defender, Goalkeeper, Midfielder, Player
+from src.train import create_teams
+
+
+def object_positioning(teams):
+    """The per-object separation and zone loop of the original tick."""
+    for team in teams:
+        for player in team.team_members:
+            if isinstance(player, Midfielder):
+                player.separate_from_others(
+                    team.team_members, min_distance=120, push_strength=2.0
+                )
+            else:
+                player.separate_from_others(team.team_members)
+            player.stay_in_zone(constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
+
+
+def object_tick(teams, ball, actions):
+    """One tick of the original per-object loop, without goal handling."""
+    width, height = constants.FIELD_WIDTH, constants.FIELD_HEIGHT
+    players = [
+        (p, t) for t, team in enumerate(teams) for p in team.team_members
+    ]
+    for (player, team), action in zip(players, actions):
+        mates = teams[team].team_members
+        opponents = teams[1 - team].team_members
+        if isinstance(player, (Goalkeeper, Defender)):
+            player.update(action, ball, width, height, mates, opponents)
+        else:
+            player.update(
+                action, ball, mates, opponents, width, height, constants.SPEED
+            )
+    object_positioning(teams)
+    ball.move()
+    ball.check_bounds(width, height)
+
+
+def random_moves(engine, rng):
+    """Random actions for one match, with kicks and tackles swapped for
+    moves so no pass is predicted or logged."""
+    sizes = np.array([p.action_size for p in engine.players])
+    actions = (rng.random(len(sizes)) * sizes).astype(np.int64)
+    actions[engine.is_goalkeeper & (actions == 2)] = 0
+    actions[engine.is_defender & (actions == 0)] = 3
+    actions[engine.is_outfield & (actions == 8)] = 9
+    return actions
+
+
+@pytest.fixture
+def match():
+    real_madrid, kairat, ball = create_teams()
+    return (real_madrid, kairat), ball
+
+
+def test_close_midfielders_are_pushed_once(match):
+    teams, ball = match
+    engine = MatchEngine(teams, ball)
+    # Line the team up far apart along the bottom touchline
+    engine.positions[0, :11] = [(40 + 95 * i, 650) for i in range(11)]
+    midfielders = [
+        i for i, p in enumerate(engine.players) if p.role == "Midfielder"
+    ][:2]
+    engine.positions[0, midfielders] = [(300, 300), (400, 300)]
+    engine.position_players()
+    # (120 - 100) / 2 * 2.0 = 20 px each, after which they are 140 apart
+    np.testing.assert_allclose(
+        engine.positions[0, midfielders], [(280, 300), (420, 300)]
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_positioning_matches_player_loop(match, seed):
+    teams, ball = match
+    engine = MatchEngine(teams, ball, num_matches=4)
+    rng = np.random.default_rng(seed)
+    size = (constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
+    # Crowd the players so many pushes chain into each other
+    engine.positions[:] = rng.uniform(0.3, 0.7, engine.positions.shape) * size
+    expected = []
+    for match_index in range(engine.num_matches):
+        engine.sync(match_index)
+        object_positioning(teams)
+        expected.append([tuple(p.position) for p in engine.players])
+    engine.position_players()
+    np.testing.assert_array_equal(engine.positions, expected)
+
+
+def test_step_matches_player_loop(match):
+    teams, ball = match
+    engine = MatchEngine(teams, ball)
+    rng = np.random.default_rng(0)
+    engine.ball_velocity[0] = (7, -4)
+    for _ in range(300):
+        actions = random_moves(engine, rng)
+        engine.sync()
+        object_tick(teams, ball, actions.tolist())
+        if engine.step(actions[None])[0] >= 0:
+            break
+        np.testing.assert_array_equal(
+            engine.positions[0], [tuple(p.position) for p in engine.players]
+        )
+        np.testing.assert_array_equal(
+            engine.ball_position[0], tuple(ball.position)
+        )
+
+
+def test_kicks_without_pass_logging_move_the_ball_the_same(match, monkeypatch):
+    teams, ball = match
+    logged = []
+    monkeypatch.setattr(
+        Player, "record_pass", lambda self, *args: logged.append(self.name)
+    )
+    velocities = []
+    for log_passes in (True, False):
+        engine = MatchEngine(teams, ball, seed=0, log_passes=log_passes)
+        forward = int(np.flatnonzero(engine.is_outfield)[0])
+        engine.positions[0, forward] = engine.ball_position[0] - (10, 0)
+        engine.kick(0, forward, np.array([900.0, 350.0]), 20)
+        velocities.append(engine.ball_velocity[0].copy())
+    assert logged == [engine.players[forward].name]
+    np.testing.assert_array_equal(velocities[0], velocities[1])
@@ -0,0 +1,32 @@
+import pytest
+
+from src.engine import MatchEngine
+from src.learner import AsyncLearner
+from src.models.match import MatchState
+from src.observation import ObservationBuilder
+from src.train import create_teams, play_episode
+
+
+@pytest.mark.parametrize("async_learner", [False, True])
+def test_epsilon_follows_ticks_not_replays(async_learner):
+    real_madrid, kairat, ball = create_teams()
+    match = MatchState((real_madrid, kairat), ball)
+    engine = MatchEngine(match.teams, ball)
+    learner = AsyncLearner(match.players).start() if async_learner else None
+    try:
+        play_episode(
+            match,
+            engine,
+            ObservationBuilder(engine),
+            replay_interval=10,
+            learner=learner,
+            max_ticks=60,
+        )
+    finally:
+        if learner is not None:
+            learner.stop()
+
+    # Every 10th tick takes one step of the schedule once the memory holds
+    # a batch of 32 transitions: ticks 40 and 50
+    for player in match.players:
+        assert player.epsilon == pytest.approx(0.995**2)
@@ -0,0 +1,41 @@
+import numpy as np
+
+from src.engine import MatchEngine
+from src.inference import BatchedInference
+from src.load import simulate_tick
+from src.models.match import MatchState
+from src.observation import ObservationBuilder
+from src.train import create_teams
+
+
+def test_last_tick_of_a_round_is_done():
+    real_madrid, kairat, ball = create_teams()
+    match = MatchState((real_madrid, kairat), ball)
+    engine = MatchEngine(match.teams, ball)
+    observations = ObservationBuilder(engine)
+    policy = BatchedInference(match.players)
+    actions = np.zeros((1, len(match.players)), dtype=np.int64)
+
+    transition = None
+    dones = []
+    for round_over in (False, False, True):
+        _, transition = simulate_tick(
+            match,
+            engine,
+            observations,
+            policy,
+            actions,
+            transition,
+            learner=None,
+            round_over=round_over,
+        )
+        dones.append(transition[3])
+    assert dones == [False, False, True]
+
+    engine.reset()
+    simulate_tick(
+        match, engine, observations, policy, actions, transition, None, False
+    )
+    player = match.players[0]
+    assert len(player.memory) == 3
+    assert player.memory.dones[2] == 1.0
@@ -0,0 +1,89 @@
+import csv
+
+import numpy as np
+
+from src.metrics import EpisodeLog, read_last_episode
+from src.train import create_teams
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.reader(f))
+
+
+def play(log, teams, agents, episodes):
+    for episode in range(episodes):
+        teams[0].score, teams[1].score = episode, 1
+        for agent in agents:
+            agent.loss_total, agent.loss_count = 2.0, 4
+        log.append(teams, agents, 100, np.array([[3.0, 6.0], [-1.0, 2.0]]))
+
+
+def test_episode_log_appends_and_resumes(tmp_path):
+    real_madrid, kairat, _ = create_teams()
+    teams = (real_madrid, kairat)
+    agents = real_madrid.team_members + kairat.team_members
+    scores, metrics = tmp_path / "scores.csv", tmp_path / "metrics.csv"
+    chunks = tmp_path / "chunks"
+
+    log = EpisodeLog(scores, metrics, chunk_dir=chunks, chunk_episodes=2)
+    play(log, teams, agents, 3)
+    assert read_last_episode(scores) == 3  # Flushed without closing
+    log.close()
+
+    log = EpisodeLog(scores, metrics, chunk_dir=chunks, chunk_episodes=2)
+    assert log.episode == 3
+    play(log, teams, agents, 2)
+    log.close()
+
+    rows = read_rows(scores)
+    assert rows[0] == ["Episode", "Real Madrid", "Kairat"]
+    assert [row[0] for row in rows[1:]] == ["1", "2", "3", "4", "5"]
+    rows = read_rows(metrics)
+    header = rows[0]
+    assert header[:6] == [
+        "Episode",
+        "Ticks",
+        "Real Madrid score",
+        "Real Madrid reward",
+        "Kairat score",
+        "Kairat reward",
+    ]
+    assert [row[0] for row in rows[1:]] == ["1", "2", "3", "4", "5"]
+    last = dict(zip(header, rows[-1]))
+    assert float(last["Real Madrid reward"]) == 0.5
+    assert float(last["Kairat reward"]) == -0.5
+    assert float(last["Kairat Forwards loss"]) == 0.5
+
+    first = np.load(chunks / "metrics_00000001.npz")
+    np.testing.assert_array_equal(first["Episode"], [1, 2])
+    resumed = np.load(chunks / "metrics_00000004.npz")
+    np.testing.assert_array_equal(resumed["Episode"], [4, 5])
+    np.testing.assert_array_equal(resumed["Real Madrid score"], [0, 1])
+
+
+def test_start_episode_drops_rows_logged_after_it(tmp_path):
+    real_madrid, kairat, _ = create_teams()
+    teams = (real_madrid, kairat)
+    agents = real_madrid.team_members + kairat.team_members
+    scores, metrics = tmp_path / "scores.csv", tmp_path / "metrics.csv"
+    chunks = tmp_path / "chunks"
+
+    log = EpisodeLog(scores, metrics, chunk_dir=chunks, chunk_episodes=2)
+    play(log, teams, agents, 5)
+    log.close()
+
+    log = EpisodeLog(
+        scores, metrics, chunk_dir=chunks, chunk_episodes=2, start_episode=3
+    )
+    assert log.episode == 3
+    play(log, teams, agents, 1)
+    log.close()
+
+    for path in (scores, metrics):
+        assert [row[0] for row in read_rows(path)[1:]] == ["1", "2", "3", "4"]
+    kept = np.load(chunks / "metrics_00000003.npz")
+    np.testing.assert_array_equal(kept["Episode"], [3])
+    resumed = np.load(chunks / "metrics_00000004.npz")
+    np.testing.assert_array_equal(resumed["Episode"], [4])
+    assert not (chunks / "metrics_00000005.npz").exists()
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from src import constants, helping
+from src.engine import MatchEngine
+from src.models.match import MatchState
+from src.observation import ObservationBuilder
+from src.train import create_teams
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_observations_match_get_state(seed):
+    real_madrid, kairat, ball = create_teams()
+    match = MatchState((real_madrid, kairat), ball)
+    engine = MatchEngine(match.teams, ball, num_matches=3)
+    rng = np.random.default_rng(seed)
+    size = (constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
+    engine.positions[:] = rng.uniform(0, 1, engine.positions.shape) * size
+    # Pull a few players together so the grid finds neighbours nearby
+    engine.positions[:, 5:9] = rng.uniform(0.4, 0.45, (3, 4, 2)) * size
+    engine.ball_position[:] = rng.uniform(0, 1, (3, 2)) * size
+    engine.ball_velocity[:] = rng.uniform(-20, 20, (3, 2))
+    engine.positions[:, 9] = engine.ball_position + 5  # Can kick
+    observations = ObservationBuilder(engine).build()
+
+    for match_index in range(engine.num_matches):
+        engine.sync(match_index)
+        for i, player in enumerate(engine.players):
+            team = player.team
+            opponent = kairat if team is real_madrid else real_madrid
+            expected = helping.get_player_state(player, ball, team, opponent)
+            row = observations[match_index, i]
+            np.testing.assert_allclose(
+                row[: player.state_size], expected.numpy(), atol=1e-6
+            )
+            assert not row[player.state_size :].any()
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from src import recording
+from src.engine import MatchEngine
+from src.recording import MatchReader, MatchRecorder, to_pixels
+from src.train import create_teams
+
+
+@pytest.mark.parametrize("compression", ["lzma", "zlib", "none"])
+def test_recording_round_trip(tmp_path, compression):
+    real_madrid, kairat, ball = create_teams()
+    teams = (real_madrid, kairat)
+    engine = MatchEngine(teams, ball, num_matches=2)
+    rng = np.random.default_rng(0)
+    path = tmp_path / "match.rec"
+    expected = []
+    with MatchRecorder(
+        path,
+        engine,
+        teams,
+        match=1,
+        chunk_ticks=16,
+        compression=compression,
+        metadata={"seed": 3},
+    ) as recorder:
+        for tick in range(50):
+            recorder.episode = 70_000 + tick // 20
+            engine.positions[:] = rng.uniform(0, 1000, engine.positions.shape)
+            engine.ball_position[:] = rng.uniform(0, 700, (2, 2))
+            actions = rng.integers(0, 10, len(engine.players))
+            goal = int(rng.integers(-1, 2))
+            scores = rng.integers(0, 9, 2)
+            recorder.record(actions, goal, scores)
+            expected.append(
+                (
+                    engine.positions[1].copy(),
+                    engine.ball_position[1].copy(),
+                    actions,
+                    goal,
+                    scores,
+                )
+            )
+
+    reader = MatchReader(path)
+    assert len(reader) == 50
+    assert reader.header["seed"] == 3
+    assert reader.header["compression"] == compression
+    records = reader.read()
+    np.testing.assert_array_equal(records, reader.read(0, 50))
+    for tick, (positions, ball_position, actions, goal, scores) in enumerate(
+        expected
+    ):
+        record = reader[tick]
+        np.testing.assert_array_equal(record, records[tick])
+        assert record["tick"] == tick
+        assert record["episode"] == 70_000 + tick // 20
+        np.testing.assert_allclose(
+            to_pixels(record["positions"]), positions, atol=0.125
+        )
+        np.testing.assert_allclose(
+            to_pixels(record["ball"]), ball_position, atol=0.125
+        )
+        np.testing.assert_array_equal(record["actions"], actions)
+        assert record["goal"] == goal
+        np.testing.assert_array_equal(record["scores"], scores)
+    np.testing.assert_array_equal(reader.read(15, 33), records[15:33])
+    reader.close()
+
+
+def test_version_1_recordings_still_read(tmp_path, monkeypatch):
+    real_madrid, kairat, ball = create_teams()
+    teams = (real_madrid, kairat)
+    engine = MatchEngine(teams, ball)
+    path = tmp_path / "old.rec"
+    monkeypatch.setattr(recording, "VERSION", 1)
+    with MatchRecorder(path, engine, teams, chunk_ticks=4) as recorder:
+        for tick in range(6):
+            recorder.episode = 65_000 + tick
+            recorder.record(np.zeros(len(engine.players)), -1, (0, 0))
+    monkeypatch.undo()
+
+    reader = MatchReader(path)
+    assert reader.header["version"] == 1
+    assert reader.dtype["episode"] == np.dtype("<u2")
+    np.testing.assert_array_equal(
+        reader.read()["episode"], 65_000 + np.arange(6)
+    )
+    reader.close()
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+import torch
+
+from src.models.players import DQN
+from src.replay import PrioritizedReplayBuffer, ReplayBuffer, td_errors
+
+
+def fill(memory, count, start=0):
+    states = np.arange(start, start + count, dtype=np.float32)[:, None]
+    memory.extend(
+        states,
+        np.arange(count),
+        np.zeros(count),
+        states,
+        np.zeros(count),
+    )
+
+
+def assert_sum_tree(memory):
+    internal = np.arange(1, memory.leaves)
+    np.testing.assert_allclose(
+        memory.tree[internal],
+        memory.tree[2 * internal] + memory.tree[2 * internal + 1],
+    )
+
+
+def test_new_transitions_get_the_highest_priority():
+    memory = PrioritizedReplayBuffer(6, 1)
+    fill(memory, 4)
+    memory.update_priorities(np.array([0, 1]), np.array([2.0, 0.5]))
+    memory.append(np.ones(1), 0, 0.0, np.ones(1), 0.0)
+    fill(memory, 3, start=10)  # Wraps around over slots 5, 0 and 1
+
+    assert len(memory) == 6
+    top = (2.0 + 1e-3) ** 0.6
+    assert memory.max_priority == pytest.approx(top)
+    # Slots 2 and 3 keep the priority of the first fill
+    np.testing.assert_allclose(
+        memory.tree[memory.leaves : memory.leaves + 6],
+        [top, top, 1.0, 1.0, top, top],
+    )
+    assert not memory.tree[memory.leaves + 6 :].any()
+    assert_sum_tree(memory)
+
+
+def test_sampling_follows_priorities():
+    np.random.seed(0)
+    memory = PrioritizedReplayBuffer(5, 1, alpha=1.0, epsilon=0.0)
+    fill(memory, 5)
+    errors = np.array([1.0, 2.0, 3.0, 4.0, 0.0])
+    memory.update_priorities(np.arange(5), errors)
+    assert_sum_tree(memory)
+
+    counts = np.zeros(5)
+    for _ in range(500):
+        batch, indices, weights = memory.sample_prioritized(40)
+        np.testing.assert_array_equal(batch[0][:, 0].numpy(), indices)
+        counts += np.bincount(indices, minlength=5)
+    np.testing.assert_allclose(counts / counts.sum(), errors / 10, atol=0.01)
+
+    # Importance-sampling weights are (N * P(i)) ** -beta, max-normalized
+    _, indices, weights = memory.sample_prioritized(40)
+    expected = (5 * errors[indices] / 10) ** -memory.beta
+    np.testing.assert_allclose(weights, expected / expected.max(), rtol=1e-5)
+
+
+def test_update_priorities_with_repeated_indices():
+    memory = PrioritizedReplayBuffer(8, 1, alpha=1.0, epsilon=0.0)
+    fill(memory, 8)
+    memory.update_priorities(np.array([3, 3, 6, 0]), np.array([5, 5, 2, 1]))
+    assert_sum_tree(memory)
+    assert memory.tree[1] == pytest.approx(5 + 2 + 1 + 5 * 1.0)
+
+
+def test_td_loss_weights_errors_and_updates_priorities():
+    torch.manual_seed(0)
+    dqn = DQN(1, 16)
+    uniform = ReplayBuffer(16, 1)
+    fill(uniform, 16)
+    np.random.seed(1)
+    loss = uniform.td_loss(dqn, 0.9, 8)
+    np.random.seed(1)
+    expected = td_errors(dqn, 0.9, uniform.sample(8)).pow(2).mean()
+    torch.testing.assert_close(loss, expected)
+
+    memory, twin = (
+        PrioritizedReplayBuffer(16, 1, alpha=1.0, epsilon=0.0) for _ in range(2)
+    )
+    fill(memory, 16)
+    fill(twin, 16)
+    np.random.seed(2)
+    loss = memory.td_loss(dqn, 0.9, 8)
+    np.random.seed(2)
+    batch, indices, weights = twin.sample_prioritized(8)
+    errors = td_errors(dqn, 0.9, batch).detach()
+    torch.testing.assert_close(loss.detach(), (weights * errors**2).mean())
+    leaves = memory.tree[memory.leaves + indices]
+    np.testing.assert_allclose(leaves, np.abs(errors.numpy()), rtol=1e-6)
+    assert_sum_tree(memory)
+
+
+def test_td_loss_keeps_priorities_of_slots_overwritten_meanwhile():
+    torch.manual_seed(0)
+    dqn = DQN(1, 16)
+    memory = PrioritizedReplayBuffer(8, 1, alpha=1.0, epsilon=0.0)
+    fill(memory, 8)
+
+    def forward_after_actor(states):
+        if not calls:  # An actor overwrites slots 0 and 1 mid-update
+            fill(memory, 2, start=100)
+        calls.append(states)
+        return dqn(states)
+
+    calls = []
+    memory.td_loss(forward_after_actor, 0.9, 8)  # Samples every slot once
+    leaves = memory.tree[memory.leaves : memory.leaves + 8]
+    np.testing.assert_array_equal(leaves[:2], 1.0)
+    assert not np.isclose(leaves[2:], 1.0).any()
+    assert_sum_tree(memory)
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from src import constants, helping
+from src.engine import MatchEngine
+from src.environment import match_rewards
+from src.train import create_teams
+
+
+@pytest.mark.parametrize("scorer", [-1, 0, 1])
+def test_match_rewards_match_calculate_reward(scorer):
+    real_madrid, kairat, ball = create_teams()
+    teams = (real_madrid, kairat)
+    engine = MatchEngine(teams, ball, num_matches=3)
+    rng = np.random.default_rng(scorer + 1)
+    size = (constants.FIELD_WIDTH, constants.FIELD_HEIGHT)
+    # Include players on and just inside the touchlines
+    engine.positions[:] = (
+        rng.uniform(-0.01, 1.01, engine.positions.shape) * size
+    )
+    engine.ball_position[:] = rng.uniform(0, 1, (3, 2)) * size
+    engine.positions[:, 3] = engine.ball_position + 10  # Within reach
+    scorers = np.full(engine.num_matches, scorer)
+    rewards = match_rewards(engine, scorers)
+
+    name = None if scorer < 0 else teams[scorer].name.lower().replace(" ", "_")
+    for match_index in range(engine.num_matches):
+        engine.sync(match_index)
+        expected = [
+            helping.calculate_reward(
+                player, ball, player.team.team_members, name, player.team.name
+            )
+            for player in engine.players
+        ]
+        np.testing.assert_allclose(rewards[match_index], expected, atol=1e-6)
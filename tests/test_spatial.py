@@ -0,0 +1,44 @@
+import numpy as np
+
+from src.spatial import SpatialGrid
+
+
+def random_grid(seed, matches=3, players=22):
+    rng = np.random.default_rng(seed)
+    positions = rng.uniform(0, 1, (matches, players, 2)) * (1050, 680)
+    grid = SpatialGrid(1050, 680, 120)
+    grid.rebuild(positions)
+    return grid, positions
+
+
+def test_pairs_within_lists_each_close_pair_once():
+    for seed in range(5):
+        grid, positions = random_grid(seed)
+        match, i, j, distance = grid.pairs_within(120)
+        found = sorted(zip(match.tolist(), i.tolist(), j.tolist()))
+        expected = []
+        for m, points in enumerate(positions):
+            diff = points[:, None] - points[None, :]
+            dist = np.linalg.norm(diff, axis=-1)
+            for a, b in zip(*np.nonzero(dist < 120)):
+                if a < b:
+                    expected.append((m, int(a), int(b)))
+        assert found == sorted(expected)
+        np.testing.assert_allclose(
+            distance,
+            np.linalg.norm(positions[match, i] - positions[match, j], axis=1),
+        )
+
+
+def test_nearest_distances_matches_full_scan():
+    rng = np.random.default_rng(0)
+    mask = rng.random((22, 22)) < 0.3
+    np.fill_diagonal(mask, False)
+    mask[0] = False  # No allowed neighbour at all
+    for seed in range(5):
+        grid, positions = random_grid(seed)
+        diff = positions[:, :, None] - positions[:, None, :]
+        dist = np.where(mask, np.linalg.norm(diff, axis=-1), np.inf)
+        np.testing.assert_allclose(
+            grid.nearest_distances(mask, 120), dist.min(axis=-1)
+        )
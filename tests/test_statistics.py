@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from src import statistics
+from src.statistics import EVIDENCE_VARIABLES
+
+
+@pytest.fixture(scope="module")
+def network():
+    return statistics.get_pass_network()
+
+
+def variable_elimination(network, evidence):
+    result = statistics.get_inference(network).query(
+        variables=["PassSuccess"], evidence=evidence, show_progress=False
+    )
+    return float(result.values[1])
+
+
+def test_compiled_table_matches_variable_elimination(network):
+    table, state_indices = statistics.compile_pass_table(network)
+    assert table.shape == tuple(
+        len(state_indices[v]) for v in EVIDENCE_VARIABLES
+    )
+    rng = np.random.default_rng(0)
+    for _ in range(40):
+        evidence = {
+            variable: rng.choice(list(state_indices[variable]))
+            for variable in EVIDENCE_VARIABLES
+        }
+        expected = variable_elimination(network, evidence)
+        assert statistics.success_probability(
+            network, evidence
+        ) == pytest.approx(expected, abs=1e-9)
+        indices = statistics.evidence_indices(network, evidence)
+        assert table[indices] == pytest.approx(expected, abs=1e-9)
+
+
+def test_batch_prediction_matches_single(network):
+    _, state_indices = statistics.compile_pass_table(network)
+    rng = np.random.default_rng(1)
+    evidences = [
+        {
+            variable: rng.choice(list(state_indices[variable]))
+            for variable in EVIDENCE_VARIABLES
+        }
+        for _ in range(20)
+    ]
+    indices = [statistics.evidence_indices(network, e) for e in evidences]
+    success, confidence, probability = statistics.predict_pass_success_batch(
+        network, indices
+    )
+    for i, evidence in enumerate(evidences):
+        prediction, expected_confidence, expected_probability = (
+            statistics.predict_pass_success(network, evidence)
+        )
+        assert success[i] == (prediction == "Success")
+        assert confidence[i] == pytest.approx(expected_confidence)
+        assert probability[i] == pytest.approx(expected_probability)
+
+
+def test_partial_evidence_uses_variable_elimination(network):
+    evidence = {"PasserRole": "Midfielder", "DistanceToTarget": "Short"}
+    assert statistics.success_probability(network, evidence) == pytest.approx(
+        variable_elimination(network, evidence)
+    )